@@ -0,0 +1,9 @@
+# atmarket
+# Shared data layer for the AT Market Snapshot dashboards
+
+import pandas as pd
+
+# The loaded dataset is shared read-only by every session in the process. Copy-on-write
+# makes slices and projections of it lazy views, and guarantees a write to one copies
+# instead of mutating the shared frames.
+pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,140 @@
+# atmarket/charts.py
+# Chart-data preparation: every chart gets a frame holding only the fields it encodes,
+# aggregated server-side and with long series downsampled, so the payload sent to the
+# browser is bounded by the chart, not by the size of the store. Compiled Vega-Lite specs
+# are cached by data and definition, so unchanged charts skip Altair on reruns.
+
+import hashlib
+import json
+import types
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from atmarket import trace
+
+# Points kept per series; enough for any dashboard-width line or area chart
+MAX_POINTS = 500
+
+
+def project(df, fields):
+    """Only ``fields`` (index levels or columns), flat, with unused categories dropped."""
+    fields = list(fields)
+    if any(name in fields for name in df.index.names if name is not None):
+        df = df.reset_index()
+    out = df[fields].copy()
+    for col in fields:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            # The category list is serialised too (as the sort order), so keep only what is plotted
+            out[col] = out[col].cat.remove_unused_categories()
+    return out.reset_index(drop=True)
+
+
+def downsample(df, x, y, max_points=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling of a series ordered by ``x``."""
+    n = len(df)
+    if n <= max_points or max_points < 3:
+        return df
+    values = df[y].to_numpy(dtype="float64", na_value=np.nan)
+    positions = np.arange(n, dtype="float64")
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = [0]
+    for start, end, next_end in zip(edges[:-1], edges[1:], np.append(edges[2:], n)):
+        # Point in this bucket forming the largest triangle with the last kept point and
+        # the mean of the next bucket
+        a = keep[-1]
+        cx, cy = positions[end:next_end].mean(), np.nanmean(values[end:next_end])
+        area = np.abs(
+            (positions[a] - cx) * (values[start:end] - values[a])
+            - (positions[a] - positions[start:end]) * (cy - values[a])
+        )
+        keep.append(start + int(np.nanargmax(area)) if np.isfinite(area).any() else start)
+    keep.append(n - 1)
+    return df.iloc[keep].reset_index(drop=True)
+
+
+def series_data(df, x, y, extra=(), max_points=MAX_POINTS):
+    """Projected, x-ordered and downsampled frame for a line/area chart of ``y`` over ``x``."""
+    out = project(df, [x, y, *extra]).sort_values(x, kind="stable")
+    return downsample(out.reset_index(drop=True), x, y, max_points)
+
+
+def records(df):
+    """Rows of ``df`` as JSON-ready dicts (NaN -> null, categories -> labels), for inline chart data."""
+    return json.loads(df.to_json(orient="records", double_precision=15))
+
+
+def to_spec(chart):
+    # Builders return an Altair chart, or (on hot paths) the Vega-Lite dict directly, which
+    # skips Altair's object model and schema validation entirely
+    return chart if isinstance(chart, dict) else chart.to_dict()
+
+
+# -----------------------------
+# Compiled spec cache
+# -----------------------------
+# Compiled specs kept (least recently used evicted first)
+SPEC_CACHE_SIZE = 256
+
+# (definition hash, data hash, params) -> (Vega-Lite dict, serialised size in bytes)
+_specs = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def _code_digest(code, digest):
+    # Bytecode and constants, recursing into nested functions / comprehensions. marshal is no
+    # good here: its output depends on refcounts and interning, so it changes after a first call
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+    return digest
+
+
+def _definition_hash(build):
+    # Reruns recompile the script, so key on the builder's name and code, not its identity
+    digest = _code_digest(build.__code__, hashlib.sha1())
+    return (build.__module__, build.__qualname__, digest.hexdigest())
+
+
+def data_hash(df):
+    digest = hashlib.sha1(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def chart_spec(build, data, **params):
+    """Vega-Lite dict for ``build(data, **params)`` (an Altair chart or a Vega-Lite dict),
+    compiled once per distinct data and definition.
+
+    ``build`` must depend only on its arguments; ``params`` must be hashable.
+    """
+    key = (_definition_hash(build), data_hash(data), tuple(sorted(params.items())))
+    with _lock:
+        entry = _specs.get(key)
+        if entry is not None:
+            _specs.move_to_end(key)
+            _stats["hits"] += 1
+    trace.count("cache_hits" if entry is not None else "cache_misses")
+    if entry is None:
+        spec = to_spec(build(data, **params))
+        entry = (spec, len(json.dumps(spec).encode()))
+        with _lock:
+            _stats["misses"] += 1
+            _specs[key] = entry
+            while len(_specs) > SPEC_CACHE_SIZE:
+                _specs.popitem(last=False)
+    trace.count("rows", len(data))
+    trace.count("bytes", entry[1])
+    return entry[0]
+
+
+def spec_cache_stats():
+    with _lock:
+        return {**_stats, "entries": len(_specs)}
@@ -0,0 +1,111 @@
+# atmarket/concentration.py
+# Market concentration analytics over the "Market by ..." sheets. The NDIA field
+# "Market concentration" is the share of payments (%) received by the top 10 providers
+# in a market; this module lines it up for every dimension, segment and period in one
+# table, with per-market rankings, quarter-on-quarter changes and thin-market flags.
+#
+# Provider-level payments are not in the exports, so an HHI cannot be derived here.
+
+import numpy as np
+import pandas as pd
+
+from atmarket.deltas import period_deltas
+from atmarket.derived import derived
+from atmarket.loader import DIMENSIONS, dimension_of
+from atmarket.model import CATEGORY, INDEX_LEVELS, PERIOD, STATE, period_dtype
+
+CONCENTRATION = "Market concentration"
+PAYMENTS = "Payments"
+
+DIMENSION = "Dimension"
+SEGMENT = "Segment"
+RANK = "Rank"
+THIN = "Thin market"
+CHANGE = "Change (pp)"
+
+# Dimension / segment label for the whole-market rows from "Market by Total"
+TOTAL = "Total"
+
+LEVELS = (DIMENSION, CATEGORY, STATE, PERIOD, SEGMENT)
+
+MARKET_SHEETS = tuple(f"Market by {breakdown}" for breakdown in DIMENSIONS)
+
+# Top-10 providers taking at least this share of payments marks a thin market
+THIN_MARKET_THRESHOLD = 70.0
+
+
+# -----------------------------
+# Build
+# -----------------------------
+def _project(df, dimension):
+    flat = df.reset_index()
+    out = flat[list(INDEX_LEVELS) + [CONCENTRATION, PAYMENTS]].copy()
+    out[SEGMENT] = flat[dimension].astype(str) if dimension else TOTAL
+    out[DIMENSION] = dimension or TOTAL
+    return out
+
+
+@derived(*MARKET_SHEETS)
+def concentration_table(frames):
+    """Concentration, payments, rank, QoQ change and thin-market flag, indexed by LEVELS.
+
+    Rank 1 is the most concentrated segment within its (dimension, category, state, period).
+    """
+    table = pd.concat([_project(frames[name], dimension_of(name)) for name in MARKET_SHEETS], ignore_index=True)
+    table = table.dropna(subset=[CONCENTRATION])
+    for col in (DIMENSION, CATEGORY, STATE, SEGMENT):
+        table[col] = table[col].astype(str).astype("category")
+    table[PERIOD] = table[PERIOD].astype(str).astype(period_dtype(table[PERIOD].astype(str)))
+
+    markets = [DIMENSION, CATEGORY, STATE, PERIOD]
+    table[RANK] = table.groupby(markets, observed=True)[CONCENTRATION].rank(method="min", ascending=False)
+    table[RANK] = table[RANK].astype("Int64")
+    table[THIN] = table[CONCENTRATION].to_numpy() >= THIN_MARKET_THRESHOLD
+    table = table.set_index(list(LEVELS)).sort_index()
+    table[CHANGE] = period_deltas(table, [CONCENTRATION], [CONCENTRATION])[f"{CONCENTRATION}_qoq"]
+    return table
+
+
+# -----------------------------
+# Access
+# -----------------------------
+def concentration_series(table, category, state, dimension=TOTAL, segment=TOTAL):
+    """Concentration per period for one market (the whole market by default)."""
+    try:
+        rows = table.xs((dimension, category, state), level=(DIMENSION, CATEGORY, STATE))
+        return rows.xs(segment, level=SEGMENT)[CONCENTRATION]
+    except KeyError:
+        return pd.Series(dtype="float64", name=CONCENTRATION)
+
+
+def ranking(table, dimension, category, state, period):
+    """Segments of one dimension, most concentrated first."""
+    try:
+        rows = table.loc[(dimension, category, state, period)]
+    except KeyError:
+        return table.iloc[:0].reset_index(list(LEVELS[:-1]), drop=True)
+    return rows.sort_values([RANK, PAYMENTS], ascending=[True, False])
+
+
+def thin_markets(table, category, state, period, threshold=THIN_MARKET_THRESHOLD):
+    """Every segment (across all dimensions) at or above ``threshold``, most concentrated first.
+
+    The whole-market Total rows are not segments and are left out, as in thin_market_share.
+    """
+    try:
+        rows = table.xs((category, state, period), level=(CATEGORY, STATE, PERIOD))
+    except KeyError:
+        return table.iloc[:0]
+    rows = rows.drop(TOTAL, level=DIMENSION, errors="ignore")
+    rows = rows[rows[CONCENTRATION].to_numpy() >= threshold]
+    return rows.sort_values([CONCENTRATION, PAYMENTS], ascending=[False, False])
+
+
+def thin_market_share(table, category, state, period, threshold=THIN_MARKET_THRESHOLD):
+    """(thin segments, segments) across every dimension for one slice."""
+    try:
+        rows = table.xs((category, state, period), level=(CATEGORY, STATE, PERIOD))
+    except KeyError:
+        return 0, 0
+    segments = rows.drop(TOTAL, level=DIMENSION, errors="ignore")
+    return int(np.count_nonzero(segments[CONCENTRATION].to_numpy() >= threshold)), len(segments)
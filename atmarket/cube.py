@@ -0,0 +1,126 @@
+# atmarket/cube.py
+# Segmentation cube: the 21 "by <dimension>" sheets melted into one long-format table
+# (Dimension, Metric, Support Category, State/Territory, Period, Segment -> Value) so any
+# "<metric> by <dimension>" chart is one indexed slice instead of a bespoke load-filter block.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from atmarket.deltas import period_deltas
+from atmarket.derived import derived
+from atmarket.loader import ALL_SHEETS, DIMENSIONS, dimension_of
+from atmarket.model import CATEGORY, INDEX_LEVELS, PERIOD, STATE, period_dtype
+from atmarket.schema import METRIC_COLUMNS, PERCENT
+
+DIMENSION = "Dimension"
+SEGMENT = "Segment"
+METRIC = "Metric"
+VALUE = "Value"
+
+CUBE_LEVELS = (DIMENSION, METRIC, CATEGORY, STATE, PERIOD, SEGMENT)
+
+SEGMENT_SHEETS = tuple(name for name in ALL_SHEETS if dimension_of(name))
+
+# Modified Monash Model bands grouped the way the dashboard talks about remoteness
+REMOTENESS_GROUPS = {
+    "MMM_1": "Metro",
+    "MMM_2": "Regional",
+    "MMM_3": "Regional",
+    "MMM_4": "Regional",
+    "MMM_5": "Regional",
+    "MMM_6": "Remote",
+    "MMM_7": "Remote",
+}
+
+
+# -----------------------------
+# Build
+# -----------------------------
+def _melt(df, dimension):
+    flat = df.reset_index()
+    metrics = [col for col in flat.columns if col in METRIC_COLUMNS]
+    long = flat.melt(
+        id_vars=list(INDEX_LEVELS) + [dimension], value_vars=metrics, var_name=METRIC, value_name=VALUE
+    )
+    long[VALUE] = long[VALUE].astype("float64")
+    long[SEGMENT] = long.pop(dimension).astype(str)
+    long[DIMENSION] = dimension
+    return long
+
+
+@derived(*SEGMENT_SHEETS)
+def build_cube(frames):
+    """Long-format cube over every segment sheet, indexed by CUBE_LEVELS."""
+    parts = [_melt(frames[name], dimension_of(name)) for name in SEGMENT_SHEETS]
+    cube = pd.concat(parts, ignore_index=True)
+    for col in (DIMENSION, METRIC, CATEGORY, STATE, SEGMENT):
+        cube[col] = cube[col].astype(str).astype("category")
+    cube[PERIOD] = cube[PERIOD].astype(str).astype(period_dtype(cube[PERIOD].astype(str)))
+    return cube.dropna(subset=[VALUE]).set_index(list(CUBE_LEVELS)).sort_index()
+
+
+@derived(*SEGMENT_SHEETS)
+def cube_deltas(frames):
+    """QoQ / YoY changes for every cube cell, aligned with build_cube's index."""
+    cube = build_cube(frames)
+    deltas = period_deltas(cube, [VALUE])
+    # Percent metrics change in percentage points; a relative change of a percentage is noise
+    pp = cube.index.get_level_values(METRIC).map(METRIC_COLUMNS).to_numpy() == PERCENT
+    deltas.loc[pp, deltas.columns.str.endswith("_pct")] = np.nan
+    return deltas
+
+
+# -----------------------------
+# Access
+# -----------------------------
+def segment_slice(cube, dimension, metric, category, state, period=None):
+    """Segment -> value (one period) or a (Period, Segment) frame (all periods)."""
+    key = (dimension, metric, category, state) if period is None else (dimension, metric, category, state, period)
+    try:
+        out = cube.loc[key, VALUE]
+    except KeyError:
+        # Same shape as a hit, so segment_frame / pivot give empty frames with the usual columns
+        names = [SEGMENT] if period is not None else [PERIOD, SEGMENT]
+        index = pd.MultiIndex.from_arrays([[]] * len(names), names=names) if len(names) > 1 else pd.Index([], name=SEGMENT)
+        return pd.Series(index=index, dtype="float64", name=VALUE)
+    return out
+
+
+def pivot(cube, dimension, metric, category, state):
+    """Periods as rows, segments as columns."""
+    return segment_slice(cube, dimension, metric, category, state).unstack(SEGMENT)
+
+
+def segment_frame(cube, dimension, metric, category, state, period):
+    """Tidy (Segment, Label, <metric>) frame for one period, ready to chart."""
+    values = segment_slice(cube, dimension, metric, category, state, period)
+    df = values.rename(metric).reset_index()
+    df.insert(1, "Label", [segment_label(dimension, s) for s in df[SEGMENT]])
+    return df
+
+
+def grouped(cube, dimension, metric, category, state, period, groups):
+    """Sum a segment slice into coarser groups (e.g. REMOTENESS_GROUPS); unmapped segments are dropped."""
+    values = segment_slice(cube, dimension, metric, category, state, period)
+    keys = values.index.map(groups)
+    return values[keys.notna()].groupby(keys[keys.notna()]).sum().rename(metric)
+
+
+# -----------------------------
+# Labels
+# -----------------------------
+def segment_label(dimension, code):
+    # Data Explorer codes ("Cerebral_Palsy", "LvlofFn_03", "MMM_1", "Age_0_to_6") -> display text
+    code = str(code)
+    if re.search(r"_missi", code, re.IGNORECASE):  # "_Missing", and truncated "_missin" / "_missi"
+        return "Missing"
+    if dimension == DIMENSIONS["Level of Function"]:
+        m = re.fullmatch(r"LvlofFn_(\d+)", code)
+        return f"Level {int(m.group(1))}" if m else code
+    if dimension == DIMENSIONS["Remoteness Rating"]:
+        return code.replace("MMM_", "MM ")
+    if dimension == DIMENSIONS["Age Group"]:
+        return code.replace("Age_", "").replace("_to_", "–").replace("plus", "+")
+    return code.replace("_", " ")
@@ -0,0 +1,53 @@
+# atmarket/deltas.py
+# Period-over-period changes for every metric column of an indexed frame, computed in one
+# vectorised pass: each row is matched to the same key one quarter (QoQ) and four quarters
+# (YoY) earlier by a merge on the period's quarter ordinal, so gaps in the series give NA
+# rather than a change against the wrong period.
+
+import numpy as np
+import pandas as pd
+
+from atmarket.model import PERIOD, period_key
+
+# Delta name -> lag in quarters
+LAGS = {"qoq": 1, "yoy": 4}
+
+_ORDINAL = "_ordinal"
+
+
+def period_ordinals(periods):
+    """Quarter number (FY start year * 4 + quarter) per period; NaN for unrecognised labels."""
+    periods = pd.Categorical(periods)
+    ordinals = np.array(
+        [np.nan if label else year * 4 + quarter for year, quarter, label in map(period_key, periods.categories)]
+        + [np.nan]  # code -1 (missing period)
+    )
+    return ordinals[periods.codes]
+
+
+def period_deltas(df, columns, pp_columns=()):
+    """Frame indexed like ``df`` with ``<col>_<lag>`` and ``<col>_<lag>_pct`` for every lag in LAGS.
+
+    ``<col>_<lag>`` is the absolute change (percentage points for ``pp_columns``);
+    ``<col>_<lag>_pct`` is the relative change in percent (NaN for ``pp_columns`` and for
+    a zero or missing base).
+    """
+    columns = list(columns)
+    groups = [name for name in df.index.names if name != PERIOD]
+    keys = df.index.to_frame(index=False)[groups]
+    keys[_ORDINAL] = period_ordinals(df.index.get_level_values(PERIOD))
+    values = df[columns].astype("float64").reset_index(drop=True)
+
+    out = {}
+    for name, lag in LAGS.items():
+        # Rows shifted forward by ``lag`` quarters line up with the rows they precede
+        prior = keys.assign(**{_ORDINAL: keys[_ORDINAL] + lag}).join(values)
+        prior = prior.dropna(subset=[_ORDINAL]).drop_duplicates(subset=groups + [_ORDINAL], keep="last")
+        base = keys.merge(prior, on=groups + [_ORDINAL], how="left")[columns].to_numpy()
+        change = values.to_numpy() - base
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(base != 0, change / np.abs(base) * 100, np.nan)
+        for i, col in enumerate(columns):
+            out[f"{col}_{name}"] = change[:, i]
+            out[f"{col}_{name}_pct"] = np.nan if col in pp_columns else pct[:, i]
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,58 @@
+# atmarket/derived.py
+# Derived results (KPIs, chart inputs, ...) memoised against the sheet frames they read.
+# Reloads keep the same frame object for every sheet whose content did not change, so a
+# result stays valid until one of its own input sheets is replaced.
+
+import functools
+import threading
+
+from atmarket import trace
+
+# (function, args) -> (sheet names, input frames, value)
+_results = {}
+_stats = {"hits": 0, "misses": 0, "invalidated": 0}
+_lock = threading.Lock()
+
+
+def derived(*sheets):
+    """Decorate ``func(frames, *args)`` so its result is reused while ``frames[sheet]`` is
+    the same object for every sheet it depends on. ``args`` must be hashable."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(frames, *args, **kwargs):
+            inputs = tuple(frames[name] for name in sheets)
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            with _lock:
+                entry = _results.get(key)
+                if entry is not None and all(a is b for a, b in zip(entry[1], inputs)):
+                    _stats["hits"] += 1
+                    trace.count("cache_hits")
+                    return entry[2]
+            value = func(frames, *args, **kwargs)
+            trace.count("cache_misses")
+            with _lock:
+                _stats["misses"] += 1
+                _results[key] = (sheets, inputs, value)
+            return value
+
+        wrapper.sheets = sheets
+        return wrapper
+
+    return decorate
+
+
+def invalidate(changed_sheets):
+    """Drop cached results that read any of ``changed_sheets``; everything else is kept."""
+    changed = set(changed_sheets)
+    with _lock:
+        stale = [key for key, (sheets, _, _) in _results.items() if changed.intersection(sheets)]
+        for key in stale:
+            del _results[key]
+        _stats["invalidated"] += len(stale)
+    return len(stale)
+
+
+def cache_stats():
+    with _lock:
+        return {**_stats, "entries": len(_results)}
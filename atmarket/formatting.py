@@ -0,0 +1,45 @@
+# atmarket/formatting.py
+# Display formatting for KPI values. Values arrive as numbers (parsed once at ingest by
+# atmarket.schema); missing values render as "n/a".
+
+import pandas as pd
+
+from atmarket.kpis import PP_COLUMNS
+
+
+def format_currency(value):
+    if pd.isna(value):
+        return "n/a"
+    if abs(value) >= 1_000_000_000:
+        return f"${value/1_000_000_000:.2f}B"
+    elif abs(value) >= 1_000_000:
+        return f"${value/1_000_000:.2f}M"
+    elif abs(value) >= 1_000:
+        return f"${value/1_000:.2f}K"
+    else:
+        return f"${value:.2f}"
+
+
+def format_number(value):
+    if pd.isna(value):
+        return "n/a"
+    return f"{int(value):,}"
+
+
+def format_percent(value):
+    if pd.isna(value):
+        return "n/a"
+    return f"{value:.0f}%"
+
+
+def format_delta(deltas, column):
+    """Change label for a KPI card from a headline_deltas row, or None without a prior period."""
+    # Year-on-year where a year of history exists, otherwise quarter-on-quarter
+    for lag, label in (("yoy", "YoY"), ("qoq", "QoQ")):
+        if column in PP_COLUMNS:
+            change = deltas[f"{column}_{lag}"]
+            if pd.notna(change):
+                return f"{change:+.1f}pp {label}"
+        elif pd.notna(deltas[f"{column}_{lag}_pct"]):
+            return f"{deltas[f'{column}_{lag}_pct']:+.1f}% {label}"
+    return None
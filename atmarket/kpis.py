@@ -0,0 +1,101 @@
+# atmarket/kpis.py
+# Materialised KPI table: every Support Category x State/Territory x Period computed in one
+# vectorised merge over the Total sheets at ingest, persisted with the historical store, and
+# read back by key at render time.
+
+import numpy as np
+
+from atmarket.deltas import period_deltas
+from atmarket.derived import derived
+from atmarket.model import ALL_SUPPORTS, CATEGORY, INDEX_LEVELS, PERIOD, STATE, latest_period, lookup, select
+
+# Pseudo-sheet name the table is stored and loaded under
+KPI_SHEET = "KPIs"
+
+KEYS = list(INDEX_LEVELS)
+
+_MARKET = {
+    "Payments": "payments",
+    "Committed supports": "committed",
+    "Utilisation": "utilisation",
+    "Market concentration": "market_concentration",
+}
+_PARTICIPANTS = {
+    "Active participants": "active_participants",
+    "Average committed support": "avg_committed",
+    "Average payments": "avg_payments",
+}
+_PROVIDERS = {
+    "Active provider": "active_providers",
+    "Participants per provider": "participants_per_provider",
+    "Provider growth": "provider_growth",
+    "Provider shrink": "provider_shrink",
+}
+
+# KPI columns already in percent, whose changes are reported in percentage points
+PP_COLUMNS = (
+    "utilisation", "market_concentration", "share_payments", "share_committed",
+    "provider_growth", "provider_shrink",
+)
+
+
+def _project(df, columns):
+    df = df.reset_index() if CATEGORY in df.index.names else df
+    return df[KEYS + list(columns)].rename(columns=columns)
+
+
+def build_kpi_table(sheets):
+    """Flat KPI table keyed by (Support Category, State/Territory, Period) from the three Total sheets."""
+    market = _project(sheets["Market by Total"], _MARKET)
+    all_supports = market.loc[market[CATEGORY] == ALL_SUPPORTS, [STATE, PERIOD, "payments", "committed"]]
+    table = market.merge(
+        all_supports.rename(columns={"payments": "all_payments", "committed": "all_committed"}),
+        on=[STATE, PERIOD],
+        how="left",
+    )
+    # Share of all NDIS supports in the same state and period ("All" itself is 100%)
+    table["share_payments"] = table["payments"] / table.pop("all_payments") * 100
+    table["share_committed"] = table["committed"] / table.pop("all_committed") * 100
+
+    table = table.merge(_project(sheets["ActPrtpnt by Total"], _PARTICIPANTS), on=KEYS, how="outer")
+    table = table.merge(_project(sheets["Provider by Total"], _PROVIDERS), on=KEYS, how="outer")
+
+    participants = table["active_participants"].astype("float64")
+    providers = table["active_providers"].astype("float64")
+    table["ppp"] = (participants / providers.where(providers > 0)).round(1).fillna(0.0)
+    table.loc[participants.isna(), "ppp"] = np.nan
+    return table.sort_values(KEYS, kind="stable").reset_index(drop=True)
+
+
+# -----------------------------
+# Render-time access
+# -----------------------------
+def headline_kpis(frames, category, state, period=None):
+    """KPI row (as a dict) for one slice; the latest period when ``period`` is None."""
+    table = frames[KPI_SHEET]
+    if period is None:
+        period = latest_period(select(table, category, state).dropna(subset=["payments"]))
+    return {"period": period, **lookup(table, category, state, period).to_dict()}
+
+
+@derived(KPI_SHEET)
+def slice_options(frames):
+    """{(category, state): [periods, oldest first]} for every slice with payments data."""
+    table = frames[KPI_SHEET].dropna(subset=["payments"])
+    keys = table.index.remove_unused_levels()
+    options = {}
+    for category, state, period in keys:
+        options.setdefault((category, state), []).append(period)
+    return options
+
+
+@derived(KPI_SHEET)
+def kpi_deltas(frames):
+    """QoQ / YoY changes for every KPI column, every slice and period (see atmarket.deltas)."""
+    table = frames[KPI_SHEET]
+    return period_deltas(table, table.columns, PP_COLUMNS)
+
+
+def headline_deltas(frames, category, state, period):
+    """Delta row (as a dict) for one slice and period; values are NaN where there is no prior period."""
+    return lookup(kpi_deltas(frames), category, state, period).to_dict()
@@ -0,0 +1,38 @@
+# atmarket/lazy.py
+# Deferred imports for heavy modules that are only needed once a section renders
+
+import importlib
+import importlib.util
+import sys
+import threading
+
+
+class _Deferred:
+    # Stands in for the module until its first attribute access. The import goes through
+    # importlib's per-module lock, so sessions rendering their first chart concurrently
+    # all see the fully initialised module (importlib.util.LazyLoader is not thread-safe).
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<deferred module {self._name!r}>"
+
+
+def lazy_import(name):
+    """Return module ``name``, deferring its actual import until an attribute is first used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    return _Deferred(name)
@@ -0,0 +1,120 @@
+# atmarket/loader.py
+# Parsing one Data Explorer export into typed, normalised frames (via its columnar snapshot);
+# atmarket.store consolidates the exports and caches the result per process
+
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+from atmarket import snapshot, trace
+from atmarket.model import index_sheet
+from atmarket.schema import apply_schema
+from atmarket.xlsx import read_workbook, read_workbook_streaming
+
+DATA_PATH = "data/Explore_Data_2025_09_18.xlsx"
+
+# Data Explorer export layout: 3 sheet families x 8 breakdowns = 24 sheets
+SHEET_FAMILIES = ("ActPrtpnt", "Market", "Provider")
+DIMENSIONS = {
+    "Total": None,
+    "Age Group": "Age Group",
+    "Primary Disability": "Primary Disability",
+    "Level of Function": "Level of Function",
+    "Remoteness Rating": "Remoteness Rating",
+    "FNP status": "First Nations Peoples status",
+    "CALD status": "CALD status",
+    "SIL or SDA": "SIL or SDA",
+}
+ALL_SHEETS = tuple(f"{family} by {breakdown}" for family in SHEET_FAMILIES for breakdown in DIMENSIONS)
+
+
+def dimension_of(sheet):
+    # "Market by Age Group" -> "Age Group"; Total sheets have no segment column
+    return DIMENSIONS.get(sheet.split(" by ", 1)[-1])
+
+
+# Exports above this size are read with the streaming (iterparse) reader
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+
+
+# -----------------------------
+# Fingerprint
+# -----------------------------
+class Fingerprint(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+# SHA is only recomputed when the stat signature changes, so a rerun costs one stat()
+_sha_memo = {}
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path):
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stat_key = (path, st.st_mtime_ns, st.st_size)
+    sha = _sha_memo.get(stat_key)
+    if sha is None:
+        sha = _sha256(path)
+        _sha_memo[stat_key] = sha
+    return Fingerprint(path, st.st_mtime_ns, st.st_size, sha)
+
+
+# -----------------------------
+# Normalisation
+# -----------------------------
+def normalise(df):
+    df.columns = df.columns.str.strip()
+    df["Support Category"] = df["Support Category"].astype(str).str.strip()
+    df["State/Territory"] = df["State/Territory"].astype(str).str.strip()
+    return df
+
+
+# -----------------------------
+# Ingest
+# -----------------------------
+def filters_key(filters):
+    # Canonical, hashable form of {column: allowed values}; None means no filtering
+    if not filters:
+        return None
+    return json.dumps({col: sorted(map(str, values)) for col, values in filters.items()}, sort_keys=True)
+
+
+def _parse(path, sheets=None, filters=None):
+    with trace.span("read", file=os.path.basename(path)) as span:
+        if filters or os.path.getsize(path) >= STREAMING_THRESHOLD:
+            frames = read_workbook_streaming(path, sheets, filters=filters)
+        else:
+            frames = read_workbook(path, sheets)
+        span["rows"] = sum(len(df) for df in frames.values())
+    with trace.span("normalise", rows=span.get("rows")):
+        frames = {name: normalise(df) for name, df in frames.items()}
+    with trace.span("parse", rows=span.get("rows")):
+        return {name: apply_schema(df) for name, df in frames.items()}
+
+
+def ingest(path, fp=None, filters=None):
+    """Flat, typed frames for one export: from its columnar snapshot if current, else parsed from the xlsx."""
+    fp = fp or fingerprint(path)
+    return snapshot.load_or_ingest(
+        path,
+        fp,
+        lambda p, sheets: _parse(p, sheets, filters=filters),
+        variant=filters_key(filters),
+    )
+
+
+def index_workbook(frames):
+    # Snapshots hold flat frames; the categorical MultiIndex is rebuilt once per process
+    return {name: index_sheet(df, dimension_of(name)) for name, df in frames.items()}
@@ -0,0 +1,77 @@
+# atmarket/memory.py
+# Process memory accounting for the shared dataset: how much the one shared copy of the
+# frames costs, and what each additional session adds on top of it.
+
+import os
+import resource
+import sys
+import threading
+
+# Process RSS and session count once the first page run completed (see record_baseline)
+_baseline = {"rss": None, "sessions": None}
+_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs (macOS): fall back to the peak, reported in bytes there
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def frames_bytes(frames):
+    """Deep in-memory size of a {name: DataFrame} mapping."""
+    return int(sum(df.memory_usage(deep=True, index=True).sum() for df in frames.values()))
+
+
+def record_baseline():
+    """Remember the RSS and sessions once a first page run has completed; later calls are no-ops.
+
+    Called at the end of the script, so one-off process costs (the shared dataset, derived
+    tables, the Altair import, compiled chart specs) are all in the baseline.
+    """
+    with _lock:
+        if _baseline["rss"] is None:
+            _baseline["rss"] = rss_bytes()
+            _baseline["sessions"] = active_sessions() or 1
+        return dict(_baseline)
+
+
+def active_sessions():
+    """Connected Streamlit sessions in this process (None outside a running server)."""
+    try:
+        from streamlit import runtime
+
+        if not runtime.exists():
+            return None
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:  # private API; absent or changed in other Streamlit versions
+        return None
+
+
+def session_memory(frames):
+    """{"rss", "baseline_rss", "shared_bytes", "sessions", "per_session_bytes"} for this process.
+
+    ``per_session_bytes`` is the growth in RSS since the first page run completed, spread
+    over the sessions opened since: near zero when sessions only hold views of the shared
+    frames, so 200 viewers cost about what one does. Until record_baseline() has run, the
+    baseline is the current RSS.
+    """
+    rss = rss_bytes()
+    with _lock:
+        baseline = dict(_baseline)
+    if baseline["rss"] is None:
+        baseline = {"rss": rss, "sessions": active_sessions() or 1}
+    sessions = active_sessions()
+    added = (sessions or 1) - baseline["sessions"]
+    return {
+        "rss": rss,
+        "baseline_rss": baseline["rss"],
+        "shared_bytes": frames_bytes(frames),
+        "sessions": sessions,
+        "per_session_bytes": max(0, rss - baseline["rss"]) // max(added, 1),
+    }
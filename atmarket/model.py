@@ -0,0 +1,94 @@
+# atmarket/model.py
+# Indexed, categorical data model: every sheet is keyed by a sorted MultiIndex on
+# (Support Category, State/Territory, Period[, segment]) so KPI lookups are index
+# accesses rather than boolean scans over whole frames.
+
+import re
+
+import pandas as pd
+
+CATEGORY = "Support Category"
+STATE = "State/Territory"
+PERIOD = "Period"
+INDEX_LEVELS = (CATEGORY, STATE, PERIOD)
+
+AT_CATEGORY = "Capital - Assistive Technology"
+ALL_SUPPORTS = "All"
+ALL_AUSTRALIA = "All Australia"
+
+_PERIOD_RE = re.compile(r"Q(\d)\s*FY(\d{2})/(\d{2})")
+
+# Display forms of categories: (title, short form used in labels such as "AT Payments").
+# Others fall back to the name without its "Capital - " style group prefix.
+CATEGORY_NAMES = {
+    AT_CATEGORY: ("Assistive Technology", "AT"),
+    ALL_SUPPORTS: ("All Supports", ""),
+}
+
+
+# -----------------------------
+# Periods
+# -----------------------------
+def period_key(period):
+    # "Q1 FY24/25" -> (2024, 1); unrecognised labels sort after known ones, lexically
+    m = _PERIOD_RE.fullmatch(str(period).strip())
+    if m is None:
+        return (9999, 9, str(period))
+    quarter, fy_start, _ = m.groups()
+    return (2000 + int(fy_start), int(quarter), "")
+
+
+def period_dtype(periods):
+    ordered = sorted(set(map(str, periods)), key=period_key)
+    return pd.CategoricalDtype(ordered, ordered=True)
+
+
+# -----------------------------
+# Labels
+# -----------------------------
+def category_title(category):
+    # "Capital - Assistive Technology" -> "Assistive Technology"; "All" -> "All Supports"
+    return CATEGORY_NAMES.get(category, (str(category).split(" - ")[-1],))[0]
+
+
+def category_label(category, template):
+    """``template`` with ``{}`` filled by the category's short form: "Active {} Participants"
+    -> "Active AT Participants" (AT) or "Active Participants" (All)."""
+    short = CATEGORY_NAMES.get(category, (None, str(category).split(" - ")[-1]))[1]
+    return " ".join(template.format(short).split())
+
+
+# -----------------------------
+# Indexing
+# -----------------------------
+def index_sheet(df, segment=None):
+    """Return ``df`` with categorical key columns moved into a sorted MultiIndex."""
+    levels = list(INDEX_LEVELS) + ([segment] if segment else [])
+    out = df.copy()
+    for col in levels:
+        if col == PERIOD:
+            out[col] = out[col].astype(period_dtype(out[col]))
+        else:
+            out[col] = out[col].astype("category")
+    return out.set_index(levels).sort_index()
+
+
+def latest_period(df):
+    periods = df.index.get_level_values(PERIOD) if PERIOD in df.index.names else df[PERIOD]
+    return periods.max()
+
+
+# -----------------------------
+# Lookups
+# -----------------------------
+def select(df, category, state, period=None):
+    """Rows for one (category, state[, period]) slice; remaining levels stay in the index."""
+    key = (category, state) if period is None else (category, state, period)
+    return df.loc[key]
+
+
+def lookup(df, category, state, period, segment=None):
+    """Single row (as a Series) for a fully specified key."""
+    key = (category, state, period) if segment is None else (category, state, period, segment)
+    row = df.loc[key]
+    return row.iloc[0] if isinstance(row, pd.DataFrame) else row
@@ -0,0 +1,106 @@
+# atmarket/query.py
+# Embedded SQL over the consolidated sheets. Every sheet (and the KPI table) is loaded
+# once per data version into an in-memory DuckDB database as a columnar table, so ad-hoc
+# cuts ("utilisation by remoteness for FNP participants in QLD") are one SQL statement
+# run by DuckDB's vectorised engine instead of another pandas filter chain.
+#
+# DuckDB is optional: query_available() is False when it is not installed and the dashboard
+# hides its query box.
+
+import importlib.util
+import os
+import re
+import threading
+
+from atmarket.store import DATA_DIR, load_history
+
+
+# Caps on what one ad-hoc query (from any viewer) can take from the container. DuckDB has
+# no statement timeout, so a query still running after QUERY_TIMEOUT is interrupted.
+QUERY_MEMORY_LIMIT = "256MB"
+QUERY_THREADS = 2
+QUERY_TIMEOUT = 10.0  # seconds
+
+
+class QueryError(ValueError):
+    """Rejected or failed ad-hoc query."""
+
+
+def query_available():
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def table_name(sheet):
+    # "Market by Age Group" -> "market_by_age_group"; "KPIs" -> "kpis"
+    return re.sub(r"[^0-9a-z]+", "_", sheet.lower()).strip("_")
+
+
+# -----------------------------
+# Per data version database
+# -----------------------------
+# data dir -> (frames the database was built from, connection)
+_connections = {}
+_lock = threading.Lock()
+
+
+def _build(frames):
+    import duckdb
+
+    con = duckdb.connect(":memory:")
+    for sheet, df in frames.items():
+        # Key columns stay categorical -> DuckDB ENUMs, so ORDER BY "Period" is chronological
+        con.register("_frame", df.reset_index())
+        con.execute(f'CREATE TABLE "{table_name(sheet)}" AS SELECT * FROM _frame')
+        con.unregister("_frame")
+    # Queries may only read the tables above: no file system access, bounded memory (no
+    # spilling to disk) and threads, no settings changes
+    con.execute("SET enable_external_access = false")
+    con.execute(f"SET memory_limit = '{QUERY_MEMORY_LIMIT}'")
+    con.execute("SET max_temp_directory_size = '0B'")
+    con.execute(f"SET threads = {int(QUERY_THREADS)}")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def connect(data_dir=DATA_DIR):
+    """Cursor on the database for the current data version (rebuilt when the store reloads)."""
+    data_dir = os.path.abspath(data_dir)
+    frames = load_history(data_dir)
+    with _lock:
+        entry = _connections.get(data_dir)
+        if entry is None or entry[0] is not frames:
+            entry = (frames, _build(frames))
+            _connections[data_dir] = entry
+        # Cursors are independent connections to the same database; safe across sessions
+        return entry[1].cursor()
+
+
+def tables(data_dir=DATA_DIR):
+    """{table name: sheet name} for every queryable table."""
+    return {table_name(sheet): sheet for sheet in load_history(data_dir)}
+
+
+def query(sql, params=None, data_dir=DATA_DIR, limit=None, timeout=QUERY_TIMEOUT):
+    """Run one read-only SELECT and return the result as a DataFrame (interrupted after ``timeout`` s)."""
+    import duckdb
+
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as exc:
+        raise QueryError(str(exc).splitlines()[0]) from exc
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise QueryError("Only a single SELECT statement is allowed")
+    cursor = connect(data_dir)
+    timer = threading.Timer(timeout, cursor.interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        relation = cursor.sql(sql, params=params)
+        return (relation if limit is None else relation.limit(limit)).df()
+    except duckdb.Error as exc:
+        if timer.finished.is_set():
+            raise QueryError(f"Query stopped after {timeout:g} s") from exc
+        raise QueryError(str(exc).splitlines()[0]) from exc
+    finally:
+        timer.cancel()
+        cursor.close()
@@ -0,0 +1,307 @@
+# atmarket/report.py
+# One-pager content shared by the dashboard and the batch renderer (scripts/render_reports.py):
+# the real-data charts and their inputs, the headline KPI cards for one slice, and static
+# HTML output (plus PNG / PDF when the optional vl-convert package is installed).
+
+import functools
+import html
+import importlib.util
+import json
+
+import pandas as pd
+
+from atmarket.charts import chart_spec, project, records, series_data
+from atmarket.cube import REMOTENESS_GROUPS, build_cube, grouped, segment_frame
+from atmarket.formatting import format_currency, format_delta, format_number, format_percent
+from atmarket.kpis import headline_deltas, headline_kpis
+from atmarket.lazy import lazy_import
+from atmarket.model import AT_CATEGORY, category_label, category_title, period_key, select
+
+alt = lazy_import("altair")
+
+IMAGE_FORMATS = ("png", "pdf")
+
+
+# -----------------------------
+# Chart builders (compiled through atmarket.charts.chart_spec)
+# -----------------------------
+# These run on every first visit to a slice, so they write the Vega-Lite dict Altair would
+# produce directly (types explicit, data inlined) rather than going through Altair.
+def _vega_lite(data, **spec):
+    return {
+        "$schema": alt.SCHEMA_URL,
+        "config": {"view": {"continuousWidth": 300, "continuousHeight": 300}},
+        "data": {"values": records(data)},
+        **spec,
+    }
+
+
+def _quantitative(field, **props):
+    return {"field": field, "type": "quantitative", **props}
+
+
+def _nominal(field, **props):
+    return {"field": field, "type": "nominal", **props}
+
+
+def spend_chart(data, title=None, category=AT_CATEGORY):
+    periods = list(data["Period"].cat.categories) if isinstance(data["Period"].dtype, pd.CategoricalDtype) \
+        else sorted(data["Period"].unique(), key=period_key)
+    period = {"field": "Period", "type": "ordinal"}
+    return _vega_lite(
+        data,
+        mark={"type": "area", "color": "#1f77b4", "opacity": 0.6},
+        encoding={
+            "x": {**period, "sort": periods},
+            "y": _quantitative("Payments", title=category_label(category, "{} Payments ($)")),
+            "tooltip": [period, _quantitative("Payments", format="$,.2f")],
+        },
+        height=200,
+        **({"title": title} if title else {}),
+    )
+
+
+def function_chart(data, category=AT_CATEGORY):
+    # Bands kept in their natural order
+    return _vega_lite(
+        data,
+        mark={"type": "bar", "color": "#2ca02c"},
+        encoding={
+            "x": _quantitative("Active participants", title="Participants"),
+            "y": _nominal("Label", title="Level of Function", sort=list(data["Label"])),
+            "tooltip": [_nominal("Label"), _quantitative("Active participants", format=",.0f")],
+        },
+        height=200,
+        title=category_label(category, "{} Participants by Level of Function"),
+    )
+
+
+def disability_chart(data, category=AT_CATEGORY):
+    y = _nominal("Label", sort="-x")
+    return _vega_lite(
+        data,
+        layer=[
+            {"mark": {"type": "circle", "color": "#2ca02c", "size": 100},
+             "encoding": {"x": _quantitative("Active participants", title="Participants"),
+                          "y": {**y, "title": "Disability"},
+                          "tooltip": [_nominal("Label"), _quantitative("Active participants", format=",.0f")]}},
+            {"mark": {"type": "rule", "color": "#2ca02c"},
+             "encoding": {"x": _quantitative("Active participants"), "y": y}},
+        ],
+        title=category_label(category, "{} Participants by Primary Disability"),
+    )
+
+
+def top10_chart(data):
+    return _vega_lite(
+        data,
+        mark={"type": "arc", "innerRadius": 50},
+        encoding={
+            "theta": _quantitative("Share"),
+            "color": _nominal("Group", scale={"scheme": "oranges"}),
+            "tooltip": [_nominal("Group"), _quantitative("Share")],
+        },
+        title="Market Concentration: Top 10 Providers",
+    )
+
+
+def regional_chart(data, order):
+    return _vega_lite(
+        data,
+        mark={"type": "bar"},
+        encoding={
+            "x": _quantitative("Providers", title="% of provider presence"),
+            "y": _nominal("Region", sort=list(order)),
+            "color": {"value": "#9467bd"},
+            "tooltip": [_nominal("Region"), _quantitative("Providers")],
+        },
+        height=200,
+        title="Regional Coverage",
+    )
+
+
+# -----------------------------
+# Chart inputs
+# -----------------------------
+def spend_data(frames, category, state):
+    # From Market by Total: one row per period
+    return series_data(select(frames["Market by Total"], category, state), "Period", "Payments")
+
+
+def function_data(cube, category, state, period):
+    # From ActPrtpnt by Level of Function
+    data = segment_frame(cube, "Level of Function", "Active participants", category, state, period)
+    return project(data, ["Label", "Active participants"])
+
+
+def disability_data(cube, category, state, period):
+    # From ActPrtpnt by Primary Disability
+    data = segment_frame(cube, "Primary Disability", "Active participants", category, state, period)
+    return project(data, ["Label", "Active participants"])
+
+
+def top10_data(share):
+    # From Market by Total: share of payments received by the top 10 providers
+    return pd.DataFrame({"Group": ["Top 10 Providers", "All Others"], "Share": [share, 100 - share]})
+
+
+def regional_data(cube, category, state, period, groups=REMOTENESS_GROUPS):
+    """(data, order) for Regional Coverage: Provider by Remoteness Rating summed into ``groups``."""
+    providers = grouped(cube, "Remoteness Rating", "Active provider", category, state, period, groups)
+    data = pd.DataFrame({
+        "Region": providers.index,
+        "Providers": (providers / providers.sum() * 100).round(1).to_numpy()
+    })
+    return data, tuple(dict.fromkeys(groups.values()))
+
+
+# -----------------------------
+# One-pager
+# -----------------------------
+# Headline cards: (label, KPI column, formatter); "{}" is the category's short form (model.category_label)
+CARDS = (
+    ("{} Payments", "payments", format_currency),
+    ("{} Committed Supports", "committed", format_currency),
+    ("Utilisation", "utilisation", format_percent),
+    ("Active {} Participants", "active_participants", format_number),
+    ("Average Committed Support", "avg_committed", format_currency),
+    ("Active {} Providers", "active_providers", format_number),
+    ("Participants per Provider", "ppp", format_number),
+    ("Top 10 Provider Share", "market_concentration", format_percent),
+)
+
+
+def one_pager(frames, category, state, period):
+    """{"title", "subtitle", "cards": [(label, value, delta)], "charts": [Vega-Lite dict]} for one slice."""
+    kpis = headline_kpis(frames, category, state, period)
+    deltas = headline_deltas(frames, category, state, period)
+    cube = build_cube(frames)
+    regional, order = regional_data(cube, category, state, period)
+    charts = [
+        chart_spec(spend_chart, spend_data(frames, category, state),
+                   title=category_label(category, "{} Payments by Period"), category=category),
+        chart_spec(top10_chart, top10_data(kpis["market_concentration"])),
+        chart_spec(function_chart, function_data(cube, category, state, period), category=category),
+        chart_spec(disability_chart, disability_data(cube, category, state, period), category=category),
+        chart_spec(regional_chart, regional, order=order),
+    ]
+    return {
+        "title": f"{category_title(category)} Market Snapshot",
+        "subtitle": f"{period} | {category.replace(' - ', ' – ')}, {state} | Source: NDIA Data Explorer",
+        "cards": [(category_label(category, label), fmt(kpis[column]), format_delta(deltas, column))
+                  for label, column, fmt in CARDS],
+        "charts": charts,
+    }
+
+
+# -----------------------------
+# Output
+# -----------------------------
+_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title} – {subtitle}</title>
+{scripts}
+<style>
+body {{ font-family: sans-serif; margin: 2rem; }}
+h1 {{ color: #4B2E83; text-align: center; margin-bottom: 0.25rem; }}
+.caption {{ color: #666; text-align: center; margin-top: 0; }}
+.cards {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin: 1.5rem 0; }}
+.card {{ border: 1px solid #ddd; border-radius: 6px; padding: 0.75rem; }}
+.label {{ color: #666; font-size: 0.85rem; }}
+.value {{ font-size: 1.6rem; }}
+.delta {{ font-size: 0.85rem; }}
+.charts {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 1.5rem; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="caption">{subtitle}</p>
+<div class="cards">
+{cards}
+</div>
+<div class="charts">
+{charts}
+</div>
+<script>
+const specs = {specs};
+specs.forEach((spec, i) => vegaEmbed("#chart" + i, spec, {{actions: false}}));
+</script>
+</body>
+</html>
+"""
+
+_CARD = ('<div class="card"><div class="label">{label}</div><div class="value">{value}</div>'
+         '<div class="delta">{delta}</div></div>')
+
+
+_CDN = """<script src="https://cdn.jsdelivr.net/npm/vega@{vega}"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@{vegalite}"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@{embed}"></script>"""
+
+
+@functools.lru_cache(maxsize=1)
+def vega_scripts():
+    # vl-convert ships the Vega / Vega-Lite / vega-embed bundle, so reports work offline when
+    # it is installed; without it the libraries load from jsDelivr
+    if not images_available():
+        return _CDN.format(vega=alt.VEGA_VERSION, vegalite=alt.VEGALITE_VERSION, embed=alt.VEGAEMBED_VERSION)
+    import vl_convert
+
+    version = "_".join(alt.SCHEMA_VERSION.split(".")[:2])  # "v6.4.1" -> "v6_4"
+    return f"<script>\n{vl_convert.javascript_bundle(vl_version=version)}\n</script>"
+
+
+def to_html(page):
+    """Single HTML file with the data inlined (and the Vega libraries, given vl-convert)."""
+    cards = "\n".join(
+        _CARD.format(label=html.escape(label), value=html.escape(value), delta=html.escape(delta or ""))
+        for label, value, delta in page["cards"]
+    )
+    charts = "\n".join(f'<div id="chart{i}"></div>' for i in range(len(page["charts"])))
+    return _HTML.format(
+        title=html.escape(page["title"]),
+        subtitle=html.escape(page["subtitle"]),
+        scripts=vega_scripts(),
+        cards=cards,
+        charts=charts,
+        specs=json.dumps(page["charts"]).replace("</", "<\\/"),
+    )
+
+
+def images_available():
+    return importlib.util.find_spec("vl_convert") is not None
+
+
+def page_spec(page, columns=2, width=360):
+    """The one-pager as one concatenated Vega-Lite spec (KPIs in the subtitle), for image export."""
+    datasets, charts = {}, []
+    for spec in page["charts"]:
+        spec = dict(spec)
+        datasets.update(spec.pop("datasets", {}))
+        spec.pop("$schema", None)
+        spec.pop("config", None)
+        spec.setdefault("width", width)
+        spec.setdefault("height", width * 3 // 4)
+        charts.append(spec)
+    rows = [{"hconcat": charts[i:i + columns]} for i in range(0, len(charts), columns)]
+    cards = [f"{label}: {value}" + (f" ({delta})" if delta else "") for label, value, delta in page["cards"]]
+    return {
+        "$schema": page["charts"][0].get("$schema") if page["charts"] else None,
+        "title": {"text": page["title"], "subtitle": [page["subtitle"], ""] + cards, "anchor": "start"},
+        "datasets": datasets,
+        "vconcat": rows,
+    }
+
+
+def to_image(page, fmt):
+    """PNG or PDF bytes for the one-pager, rendered locally by vl-convert."""
+    import vl_convert
+
+    spec = page_spec(page)
+    if fmt == "png":
+        return vl_convert.vegalite_to_png(spec, scale=2)
+    if fmt == "pdf":
+        return vl_convert.vegalite_to_pdf(spec)
+    raise ValueError(f"Unsupported image format: {fmt!r}")
@@ -0,0 +1,56 @@
+# atmarket/schema.py
+# Declared column types for the Data Explorer sheets. Currency, percentage and count
+# text is parsed once at ingest so everything downstream works on numbers only.
+
+import pandas as pd
+
+CURRENCY = "currency"   # "$1,234.56" -> float64 dollars
+PERCENT = "percent"     # "68" / "68%" -> float64 percentage points
+COUNT = "count"         # "94340" -> Int64; suppressed cells ("< 11") -> <NA>
+RATIO = "ratio"         # "102.66" -> float64
+
+# Key columns present on every sheet
+KEY_COLUMNS = ("Period", "State/Territory", "Support Category")
+
+METRIC_COLUMNS = {
+    # ActPrtpnt by ...
+    "Active participants": COUNT,
+    "Average committed support": CURRENCY,
+    "Average payments": CURRENCY,
+    # Market by ...
+    "Market concentration": PERCENT,
+    "Payments": CURRENCY,
+    "Committed supports": CURRENCY,
+    "Utilisation": PERCENT,
+    # Provider by ...
+    "Active provider": COUNT,
+    "Participants per provider": RATIO,
+    "Provider growth": PERCENT,
+    "Provider shrink": PERCENT,
+}
+
+# Characters stripped from currency / percentage text before numeric conversion
+_NON_NUMERIC = r"[$,%\s]"
+
+
+def parse_numeric(series):
+    """Vectorised text -> float64; anything unparseable (e.g. suppressed "< 11") becomes NaN."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float64")
+    text = series.astype("string").str.replace(_NON_NUMERIC, "", regex=True)
+    return pd.to_numeric(text, errors="coerce").astype("float64")
+
+
+def parse_column(series, kind):
+    values = parse_numeric(series)
+    if kind == COUNT:
+        return values.round().astype("Int64")
+    return values
+
+
+def apply_schema(df):
+    """Convert every declared metric column present in ``df`` to its numeric dtype, in place."""
+    for col, kind in METRIC_COLUMNS.items():
+        if col in df.columns:
+            df[col] = parse_column(df[col], kind)
+    return df
@@ -0,0 +1,130 @@
+# atmarket/snapshot.py
+# Columnar (Parquet) snapshot of a Data Explorer export, written next to the source file.
+# Later process starts memory-map the snapshot instead of parsing the xlsx, and re-ingest
+# only when the source fingerprint changes - and then only the sheets whose zip entries
+# changed.
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from atmarket.xlsx import sheet_digests
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIRNAME = ".snapshot"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 2  # 2: metric columns stored as typed numbers
+
+
+def snapshot_dir(path, variant=None):
+    # ``variant`` distinguishes filtered ingests of the same export
+    path = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if variant:
+        stem = f"{stem}@{hashlib.sha1(variant.encode()).hexdigest()[:10]}"
+    return os.path.join(os.path.dirname(path), SNAPSHOT_DIRNAME, stem)
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+# -----------------------------
+# Read / write
+# -----------------------------
+def _read_frames(directory, manifest, names=None):
+    names = manifest["sheets"] if names is None else names
+    try:
+        return {
+            name: pq.read_table(os.path.join(directory, manifest["sheets"][name]), memory_map=True).to_pandas()
+            for name in names
+        }
+    except (OSError, pa.ArrowException) as exc:
+        logger.warning("Ignoring unreadable snapshot %s: %s", directory, exc)
+        return None
+
+
+def _reusable(directory, manifest, digests):
+    # Sheets from a stale snapshot whose worksheet entry (and the shared strings it
+    # indexes into) are byte-for-byte unchanged in the new export
+    if manifest is None or not manifest.get("digests"):
+        return {}
+    old = manifest["digests"]
+    if old.get("shared_strings") != digests["shared_strings"]:
+        return {}
+    names = [
+        name for name, digest in digests["sheets"].items()
+        if digest is not None and old["sheets"].get(name) == digest and name in manifest["sheets"]
+    ]
+    return _read_frames(directory, manifest, names) or {}
+
+
+def write_snapshot(path, frames, fp, variant=None, digests=None):
+    """Write one Parquet file per sheet; the manifest is swapped in last so readers never see a partial snapshot."""
+    directory = snapshot_dir(path, variant)
+    parent = os.path.dirname(directory)
+    staging = None
+    try:
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".ingest-", dir=parent)
+        sheets = {}
+        for i, (name, df) in enumerate(frames.items()):
+            filename = f"sheet{i + 1:02d}.parquet"
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(staging, filename))
+            sheets[name] = filename
+        manifest = {
+            "format": FORMAT_VERSION,
+            "source": os.path.basename(fp.path),
+            "mtime_ns": fp.mtime_ns,
+            "size": fp.size,
+            "sha256": fp.sha256,
+            "variant": variant,
+            "digests": digests,
+            "sheets": sheets,
+        }
+        with open(os.path.join(staging, MANIFEST), "w") as fh:
+            json.dump(manifest, fh, indent=2)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(staging, directory)
+    except OSError as exc:
+        # A read-only data volume just means every process start parses the xlsx
+        logger.warning("Could not write snapshot for %s: %s", path, exc)
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        return False
+    return True
+
+
+def load_or_ingest(path, fp, ingest, variant=None):
+    """Frames from the snapshot if current; otherwise ``ingest(path, sheets)`` parses the
+    sheets that changed since the last snapshot and the result is written back."""
+    directory = snapshot_dir(path, variant)
+    manifest = _read_manifest(directory)
+    if manifest is not None and manifest["sha256"] == fp.sha256:
+        frames = _read_frames(directory, manifest)
+        if frames is not None:
+            return frames
+    digests = sheet_digests(path)
+    reused = _reusable(directory, manifest, digests)
+    todo = [name for name in digests["sheets"] if name not in reused]
+    if reused:
+        logger.info("Re-ingesting %d of %d sheets from %s", len(todo), len(digests["sheets"]), path)
+    parsed = ingest(path, todo) if todo else {}
+    frames = {name: reused[name] if name in reused else parsed[name] for name in digests["sheets"]}
+    write_snapshot(path, frames, fp, variant, digests)
+    return frames
@@ -0,0 +1,273 @@
+# atmarket/store.py
+# Append-only historical store over every dated Data Explorer export in data/.
+# Each Explore_Data_YYYY_MM_DD.xlsx is ingested once (via its columnar snapshot);
+# overlapping periods are de-duplicated with the newest export winning, and the
+# consolidated series is kept as one Parquet file per sheet under data/.store/, alongside
+# the KPI table derived from it (atmarket.kpis).
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from types import MappingProxyType
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from atmarket import derived, loader, trace
+from atmarket.kpis import KPI_SHEET, build_kpi_table
+from atmarket.model import INDEX_LEVELS, index_sheet
+
+logger = logging.getLogger(__name__)
+
+# Overridable so a deployment (or scripts/load_test.py) can point the app at another dataset
+DATA_DIR = os.environ.get("ATMARKET_DATA_DIR", "data")
+
+# Optional row filters applied at ingest, as JSON {column: [allowed values]}, e.g.
+#   ATMARKET_FILTERS='{"State/Territory": ["All Australia", "NSW"]}'
+# Filtered exports are streamed and only matching rows are kept, so a large production
+# export costs memory in proportion to the slice served. Keep the "All" Support Category
+# for the share-of-total KPIs.
+FILTERS = json.loads(os.environ.get("ATMARKET_FILTERS") or "null")
+STORE_DIRNAME = ".store"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 2  # 2: adds the materialised KPI table
+
+EXPORT_RE = re.compile(r"Explore_Data_(\d{4})_(\d{2})_(\d{2})\.xlsx")
+
+# Column recording which export a row came from (ISO date of the download)
+EXPORT = "Export"
+
+
+# -----------------------------
+# Discovery
+# -----------------------------
+def discover(data_dir=DATA_DIR):
+    """[(export date, path)] for every dated export in ``data_dir``, oldest first."""
+    exports = []
+    for name in os.listdir(data_dir):
+        m = EXPORT_RE.fullmatch(name)
+        if m is None:
+            continue  # includes Excel lock files such as "~$Explore_Data_..."
+        exports.append(("-".join(m.groups()), os.path.join(data_dir, name)))
+    return sorted(exports)
+
+
+def store_dir(data_dir=DATA_DIR):
+    return os.path.join(data_dir, STORE_DIRNAME)
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _read_sheets(directory, manifest):
+    return {
+        name: pq.read_table(os.path.join(directory, filename), memory_map=True).to_pandas()
+        for name, filename in manifest["sheets"].items()
+    }
+
+
+# -----------------------------
+# Consolidation
+# -----------------------------
+def _row_key(sheet, df):
+    segment = loader.dimension_of(sheet)
+    return list(INDEX_LEVELS) + ([segment] if segment and segment in df.columns else [])
+
+
+def _merge(sheet, current, incoming):
+    # Newest export wins for any (category, state, period[, segment]) present in both
+    frames = [df for df in (current, incoming) if df is not None and len(df)]
+    if not frames:
+        return incoming if incoming is not None else current
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.sort_values(EXPORT, kind="stable")
+    merged = merged.drop_duplicates(subset=_row_key(sheet, merged), keep="last")
+    return merged.sort_values(_row_key(sheet, merged), kind="stable").reset_index(drop=True)
+
+
+def _write(directory, sheets, exports, filters=None):
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for i, (name, df) in enumerate(sheets.items()):
+        filename = f"sheet{i + 1:02d}.parquet"
+        fd, tmp = tempfile.mkstemp(suffix=".parquet", dir=directory)
+        os.close(fd)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        os.replace(tmp, os.path.join(directory, filename))
+        files[name] = filename
+    manifest = {"format": FORMAT_VERSION, "exports": exports, "sheets": files, "filters": loader.filters_key(filters)}
+    fd, tmp = tempfile.mkstemp(suffix=".json", dir=directory)
+    with os.fdopen(fd, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    # Swapped in last: readers only ever see a manifest whose sheet files are complete
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+
+def refresh(data_dir=DATA_DIR, filters=FILTERS):
+    """Ingest exports the store has not seen (or that changed) and return the consolidated flat frames.
+
+    ``filters`` ({column: allowed values}) keeps only matching rows; a store built with
+    other filters is rebuilt. Returns (frames, exports) where exports maps file name ->
+    {"date", "sha256"}.
+    """
+    directory = store_dir(data_dir)
+    manifest = _read_manifest(directory)
+    if manifest is None or manifest.get("filters") != loader.filters_key(filters):
+        manifest = {"exports": {}, "sheets": {}}
+    known = manifest["exports"]
+    found = {os.path.basename(path): (date, loader.fingerprint(path)) for date, path in discover(data_dir)}
+
+    changed = {name for name, (_, fp) in found.items() if known.get(name, {}).get("sha256") != fp.sha256}
+    removed = set(known) - set(found)
+    sheets = _read_sheets(directory, manifest) if manifest["sheets"] else {}
+    if not changed and not removed:
+        return sheets, known
+    sheets.pop(KPI_SHEET, None)  # rebuilt from the merged sheets below
+
+    if removed or changed & set(known):
+        # A removed or re-exported file may have shadowed rows of older exports, and those
+        # were dropped when it was merged: rebuild from every export (from their snapshots,
+        # so only the changed file is parsed). New files merge on top of what is stored.
+        sheets, changed = {}, set(found)
+
+    for name in sorted(changed, key=lambda n: found[n][0]):
+        date, fp = found[name]
+        logger.info("Ingesting %s into the historical store", name)
+        for sheet, df in loader.ingest(fp.path, fp, filters=filters).items():
+            df = df.assign(**{EXPORT: date})
+            sheets[sheet] = _merge(sheet, sheets.get(sheet), df)
+
+    sheets[KPI_SHEET] = build_kpi_table(sheets)
+    exports = {name: {"date": date, "sha256": fp.sha256} for name, (date, fp) in found.items()}
+    try:
+        _write(directory, sheets, exports, filters)
+    except OSError as exc:
+        logger.warning("Could not persist historical store in %s: %s", directory, exc)
+    return sheets, exports
+
+
+# -----------------------------
+# Process-wide cache
+# -----------------------------
+# (data dir, filters) -> (signature, indexed frames, per-sheet content versions)
+_cache = {}
+_stats = {"hits": 0, "misses": 0, "last_changed": []}
+_lock = threading.Lock()
+# (data dir, filters) -> lock held while that store is re-ingested
+_refreshing = {}
+# (data dir, filters) -> signature of exports that failed to ingest (not retried until they change)
+_failed = {}
+
+
+def _signature(data_dir):
+    # Cheap per-rerun check: the set of exports and their fingerprints
+    return tuple((os.path.basename(path), loader.fingerprint(path).sha256) for _, path in discover(data_dir))
+
+
+def data_version(data_dir=DATA_DIR, filters=FILTERS):
+    """Digest of the exports in ``data_dir`` (and ``filters``); changes whenever an export is added,
+    removed or edited."""
+    key = (_signature(os.path.abspath(data_dir)), loader.filters_key(filters))
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def content_version(df):
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_history(data_dir=DATA_DIR, filters=FILTERS, serve_stale=True):
+    """Indexed frames spanning every export in ``data_dir``; re-consolidates only when exports change.
+
+    Sheets whose consolidated content is unchanged keep their previous frame object, so
+    only derived results that read a changed sheet are recomputed (see atmarket.derived).
+    The returned mapping is read-only and shared across callers; do not mutate its frames.
+    ``filters`` ({column: allowed values}) keeps only matching rows (see FILTERS).
+
+    Once a store is loaded and ``serve_stale``, callers never wait on or fail with a reload:
+    while another thread re-ingests, or if the new exports cannot be ingested (a file still
+    being copied in, or not a valid export), the previously loaded frames are returned. A
+    failed set of exports is not retried until it changes again.
+    """
+    key = (os.path.abspath(data_dir), loader.filters_key(filters))
+    try:
+        return _load_history(key, filters, serve_stale)
+    except Exception as exc:
+        with _lock:
+            entry = _cache.get(key)
+        if entry is None or not serve_stale:
+            raise
+        logger.warning("Serving the previous store for %s: %s", data_dir, exc)
+        return entry[1]
+
+
+def _load_history(key, filters, serve_stale):
+    data_dir = key[0]
+    signature = _signature(data_dir)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and (entry[0] == signature or (serve_stale and _failed.get(key) == signature)):
+            _stats["hits"] += 1
+            trace.count("cache_hits")
+            return entry[1]
+        refreshing = _refreshing.setdefault(key, threading.Lock())
+    # One re-ingest per store at a time, outside _lock so other stores and cache hits are
+    # not held up; sessions keep the current frames meanwhile
+    if not refreshing.acquire(blocking=entry is None or not serve_stale):
+        return entry[1]
+    try:
+        with _lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]  # refreshed by another thread while this one waited
+            _stats["misses"] += 1
+        trace.count("cache_misses")
+        try:
+            sheets, _ = refresh(data_dir, filters)
+        except Exception:
+            with _lock:
+                _failed[key] = signature
+            raise
+        prev_frames, prev_versions = (entry[1], entry[2]) if entry is not None else ({}, {})
+        frames, versions, changed = {}, {}, []
+        for name, df in sheets.items():
+            versions[name] = content_version(df)
+            if prev_versions.get(name) == versions[name]:
+                frames[name] = prev_frames[name]
+            else:
+                frames[name] = index_sheet(df, loader.dimension_of(name))
+                changed.append(name)
+        if entry is not None:
+            changed += [name for name in prev_frames if name not in frames]
+            derived.invalidate(changed)
+        else:
+            changed = []  # a first load is not a change
+        # One read-only mapping per data version, shared by every session in the process;
+        # with copy-on-write (see atmarket/__init__.py) slices of it are views, not copies
+        frames = MappingProxyType(frames)
+        with _lock:
+            _stats["last_changed"] = changed
+            _failed.pop(key, None)
+            _cache[key] = (signature, frames, versions)
+        return frames
+    finally:
+        refreshing.release()
+
+
+def cache_stats():
+    with _lock:
+        return {**_stats, "last_changed": list(_stats["last_changed"]), "entries": len(_cache)}
@@ -0,0 +1,294 @@
+# atmarket/synthetic.py
+# Synthetic Data Explorer exports for scale testing: the 24-sheet layout and column schema
+# of the real export, with plausible, internally consistent values, scaled by periods,
+# states, support categories and segment cardinality. Written as xlsx (shared strings,
+# text currency and counts, as the Data Explorer does) and optionally as Parquet.
+
+import itertools
+import math
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from atmarket.loader import ALL_SHEETS, dimension_of, normalise
+from atmarket.model import ALL_AUSTRALIA, ALL_SUPPORTS, AT_CATEGORY, CATEGORY, PERIOD, STATE, period_key
+from atmarket.schema import apply_schema
+
+# Columns after the key columns (and segment column, if any) on each sheet family
+FAMILY_COLUMNS = {
+    "ActPrtpnt": ("Active participants", "Average committed support", "Average payments"),
+    "Market": ("Market concentration", "Payments", "Committed supports", "Utilisation"),
+    "Provider": ("Active provider", "Participants per provider", "Provider growth", "Provider shrink"),
+}
+
+# Segment codes per dimension, as the Data Explorer spells them
+SEGMENTS = {
+    "Age Group": ("Age_0_to_6", "Age_7_to_14", "Age_15_to_18", "Age_19_to_24", "Age_25_to_34",
+                  "Age_35_to_44", "Age_45_to_54", "Age_55_to_64", "Age_65plus", "Age_Missing"),
+    "Primary Disability": ("ABI", "Autism", "Cerebral_Palsy", "Developmental_delay", "Disability_Missing",
+                           "Down_Syndrome", "Global_developmental_delay", "Hearing_Impairment",
+                           "Intellectual_Disability", "Multiple_Sclerosis", "Other", "Other_Neurological",
+                           "Other_Physical", "Other_Sensory_Speech", "Psychosocial_disability",
+                           "Spinal_Cord_Injury", "Stroke", "Visual_Impairment"),
+    "Level of Function": tuple(f"LvlofFn_{i:02d}" for i in range(1, 16)) + ("LvlofFn_Missing",),
+    "Remoteness Rating": tuple(f"MMM_{i}" for i in range(1, 8)) + ("MMM_Missing",),
+    "First Nations Peoples status": ("Indigenous", "Non_Ind", "No_Ind_St", "Ind_Missing"),
+    "CALD status": ("CALD", "NON_CALD", "NO_CALD_ST", "CALD_Missing"),
+    "SIL or SDA": ("SIL_SDA", "NON_SIL_SDA"),
+}
+
+# State/Territory -> share of national participants
+STATES = {"NSW": 0.32, "VIC": 0.26, "QLD": 0.20, "WA": 0.09, "SA": 0.08, "TAS": 0.025, "ACT": 0.015, "NT": 0.01}
+
+# Support Category -> (share of all participants, average committed support $, participants per provider)
+CATEGORIES = {
+    ALL_SUPPORTS: (1.0, 40_000, 2.5),
+    AT_CATEGORY: (0.135, 5_000, 100),
+    "Core - Daily Activities": (0.45, 60_000, 8),
+    "Core - Consumables": (0.50, 2_000, 60),
+    "Core - Social and Civic": (0.35, 25_000, 10),
+    "Core - Transport": (0.30, 3_000, 40),
+    "Capacity Building - Daily Activities": (0.75, 12_000, 6),
+    "Capacity Building - Support Coordination": (0.40, 4_000, 20),
+    "Capital - Home Modifications": (0.03, 15_000, 30),
+    "Capacity Building - Employment": (0.05, 10_000, 15),
+}
+
+# Participants nationally, all support categories, in the first generated period
+PARTICIPANTS = 680_000
+
+# Counts below this are published as "< 11"
+SUPPRESSION_THRESHOLD = 11
+
+# Rows in the bundled export, the unit for ``scale``
+REAL_ROWS = 1433
+
+
+# -----------------------------
+# Dimensions
+# -----------------------------
+def period_labels(periods, last="Q4 FY24/25"):
+    """``periods`` consecutive quarter labels ending at ``last``, oldest first."""
+    year, quarter, _ = period_key(last)
+    ordinal = year * 4 + quarter - 1
+    labels = []
+    for n in range(ordinal - periods + 1, ordinal + 1):
+        year, q = divmod(n, 4)
+        labels.append(f"Q{q + 1} FY{year % 100:02d}/{(year + 1) % 100:02d}")
+    return labels
+
+
+def state_labels(states):
+    """"All Australia" first, then ``states - 1`` States/Territories (synthetic regions past eight)."""
+    names = list(STATES) + [f"Region {i}" for i in range(len(STATES) + 1, states)]
+    return [ALL_AUSTRALIA] + names[:states - 1]
+
+
+def category_labels(categories):
+    names = list(CATEGORIES) + [f"Category {i}" for i in range(len(CATEGORIES) + 1, categories + 1)]
+    return names[:categories]
+
+
+def segment_codes(dimension, factor=1):
+    """Codes for ``dimension``, repeated ``factor`` times with numbered variants for higher cardinality."""
+    codes = SEGMENTS[dimension]
+    return list(codes) + [f"{code}_{i}" for i in range(2, factor + 1) for code in codes]
+
+
+def rows_per_export(periods, states, categories, segment_factor=1):
+    segments = sum(len(codes) for codes in SEGMENTS.values()) * segment_factor + 1  # + the Total sheet
+    return len(FAMILY_COLUMNS) * periods * states * categories * segments
+
+
+def params_for_scale(scale):
+    """{periods, states, categories, segment_factor} giving about ``scale`` x the bundled export's rows.
+
+    Grows the layout the way real exports grow: States/Territories first, then more
+    quarters of history, then support categories, then segment cardinality.
+    """
+    params = {"periods": 4, "states": 1, "categories": 2, "segment_factor": 1}
+    limits = (("states", len(STATES) + 1), ("periods", 16), ("categories", len(CATEGORIES)),
+              ("segment_factor", None))
+    target = scale * REAL_ROWS
+    for name, limit in limits:
+        while rows_per_export(**params) < target and (limit is None or params[name] < limit):
+            params[name] += 1
+    return params
+
+
+# -----------------------------
+# Values
+# -----------------------------
+def sheet_frame(sheet, periods, states, categories, segment_factor=1, rng=None, thousands=True):
+    """One sheet as the Data Explorer exports it: text currency and participant counts, numbers elsewhere."""
+    rng = rng if rng is not None else np.random.default_rng(0)
+    family = sheet.split(" by ", 1)[0]
+    dimension = dimension_of(sheet)
+    codes = segment_codes(dimension, segment_factor) if dimension else [None]
+
+    grid = pd.DataFrame(list(itertools.product(periods, states, categories, codes)),
+                        columns=[PERIOD, STATE, CATEGORY, "segment"])
+    n = len(grid)
+    growth = 1.02 ** grid[PERIOD].map({p: i for i, p in enumerate(periods)}).to_numpy()
+    state_share = grid[STATE].map(lambda s: 1.0 if s == ALL_AUSTRALIA else STATES.get(s, 0.01)).to_numpy()
+    profile = {c: CATEGORIES.get(c, (rng.uniform(0.02, 0.5), rng.uniform(2_000, 50_000), rng.uniform(5, 80)))
+               for c in categories}
+    share, committed, ppp = (grid[CATEGORY].map(lambda c, i=i: profile[c][i]).to_numpy() for i in range(3))
+    weights = rng.dirichlet(np.ones(len(codes)) * 2) if dimension else np.ones(1)
+    segment_share = grid["segment"].map(dict(zip(codes, weights))).to_numpy() if dimension else np.ones(n)
+
+    # Each (state, category, segment) cell keeps its level from quarter to quarter (periods
+    # vary slowest in the grid), with a few percent of movement per quarter
+    cell = np.arange(n) % (n // len(periods))
+    cells = cell.max() + 1
+    participants = np.round(PARTICIPANTS * share * state_share * segment_share * growth
+                            * rng.uniform(0.97, 1.03, n))
+    avg_committed = committed * rng.lognormal(0, 0.3, cells)[cell] * growth * rng.uniform(0.97, 1.03, n)
+    utilisation = np.clip(rng.uniform(0.55, 0.85, cells)[cell] + rng.normal(0, 0.02, n), 0.05, 1.0)
+
+    out = grid[[PERIOD, STATE, CATEGORY]].copy()
+    if dimension:
+        out[dimension] = grid["segment"]
+    if family == "ActPrtpnt":
+        out["Active participants"] = [
+            "< 11" if v < SUPPRESSION_THRESHOLD else str(int(v)) for v in participants
+        ]
+        out["Average committed support"] = currency(avg_committed, thousands)
+        out["Average payments"] = currency(avg_committed * utilisation, thousands)
+    elif family == "Market":
+        committed_total = participants * avg_committed
+        out["Market concentration"] = np.clip(
+            np.round(4 + 300 / np.sqrt(participants / 100 + 1) * rng.uniform(0.5, 1.5, cells)[cell]), 1, 100
+        ).astype(int)
+        out["Payments"] = currency(committed_total * utilisation, thousands)
+        out["Committed supports"] = currency(committed_total, thousands)
+        out["Utilisation"] = np.round(utilisation * 100).astype(int)
+    else:
+        providers = np.maximum(1, np.round(participants / (ppp * rng.lognormal(0, 0.2, cells)[cell])))
+        out["Active provider"] = providers.astype(int)
+        out["Participants per provider"] = np.round(participants / providers, 2)
+        out["Provider growth"] = rng.integers(0, 21, n)
+        out["Provider shrink"] = rng.integers(0, 71, n)
+    return out
+
+
+def currency(values, thousands=True):
+    # "$1,234.56" (or "$1234.56", as the bundled export writes it)
+    fmt = "${:,.2f}" if thousands else "${:.2f}"
+    return [fmt.format(v) for v in values]
+
+
+def generate(periods=4, states=1, categories=2, segment_factor=1, seed=0, thousands=True):
+    """{sheet name: DataFrame} for all 24 sheets, in export order."""
+    rng = np.random.default_rng(seed)
+    labels = period_labels(periods), state_labels(states), category_labels(categories)
+    return {sheet: sheet_frame(sheet, *labels, segment_factor, rng, thousands) for sheet in ALL_SHEETS}
+
+
+# -----------------------------
+# Output
+# -----------------------------
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_TYPE = ('<Override PartName="/xl/worksheets/sheet{i}.xml" '
+               'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}'
+    '<Relationship Id="rIdSST" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/></Relationships>'
+)
+_SHEET_REL = ('<Relationship Id="rId{i}" '
+              'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+              'Target="worksheets/sheet{i}.xml"/>')
+_MAIN_NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+
+
+def _column_letter(i):
+    letters = ""
+    i += 1
+    while i:
+        i, rem = divmod(i - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _worksheet(df, strings):
+    # Text goes through the shared-string table, numbers are written inline
+    letters = [_column_letter(i) for i in range(df.shape[1])]
+    parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet {_MAIN_NS}><sheetData>']
+    rows = itertools.chain([list(df.columns)], df.itertuples(index=False, name=None))
+    for r, row in enumerate(rows, start=1):
+        cells = []
+        for letter, value in zip(letters, row):
+            if isinstance(value, str):
+                index = strings.setdefault(value, len(strings))
+                cells.append(f'<c r="{letter}{r}" t="s"><v>{index}</v></c>')
+            elif value is not None and not (isinstance(value, float) and math.isnan(value)):
+                cells.append(f'<c r="{letter}{r}"><v>{value}</v></c>')
+        parts.append(f'<row r="{r}">{"".join(cells)}</row>')
+    parts.append("</sheetData></worksheet>")
+    return "".join(parts)
+
+
+def write_xlsx(frames, path):
+    """Write ``frames`` as a minimal xlsx workbook (one worksheet per frame, shared strings)."""
+    strings = {}
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, df in enumerate(frames.values(), start=1):
+            zf.writestr(f"xl/worksheets/sheet{i}.xml", _worksheet(df, strings))
+        n = len(frames)
+        sst = "".join(f"<si><t>{escape(s)}</t></si>" for s in strings)
+        zf.writestr("xl/sharedStrings.xml",
+                    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<sst {_MAIN_NS} count="{len(strings)}" uniqueCount="{len(strings)}">{sst}</sst>')
+        sheets = "".join(
+            f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(frames, start=1)
+        )
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(sheets=sheets))
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    _WORKBOOK_RELS.format(rels="".join(_SHEET_REL.format(i=i) for i in range(1, n + 1))))
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("[Content_Types].xml",
+                    _CONTENT_TYPES.format(sheets="".join(_SHEET_TYPE.format(i=i) for i in range(1, n + 1))))
+    return path
+
+
+def write_parquet(frames, directory):
+    """One Parquet file per sheet, typed as atmarket.schema parses them (as the snapshot holds them)."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, df in frames.items():
+        paths[name] = os.path.join(directory, f"{name}.parquet")
+        typed = apply_schema(normalise(df.copy()))
+        pq.write_table(pa.Table.from_pandas(typed, preserve_index=False), paths[name])
+    return paths
+
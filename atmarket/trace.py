@@ -0,0 +1,148 @@
+# atmarket/trace.py
+# Lightweight per-rerun span tracing. The dashboard opens a trace per script run (and per
+# fragment rerun); stages wrap themselves in spans recording duration, row counts, cache
+# hits / misses and payload bytes. Library code counts on the innermost open span, and
+# everything is a no-op when no trace is active (scripts, tests, worker processes).
+#
+# Finished traces are printed as JSON lines on stdout when ATMARKET_TRACE=1 (set in the
+# Docker image), one line per span, for the log pipeline to chart.
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+EMIT = os.environ.get("ATMARKET_TRACE", "").lower() not in ("", "0", "false", "no")
+
+# The trace of the run executing in this thread / context, if any
+_current = contextvars.ContextVar("atmarket_trace", default=None)
+_emit_lock = threading.Lock()
+
+
+class Trace:
+    """One run: a root span named after it, with stages nested below."""
+
+    def __init__(self, name, **attrs):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.wall_start = time.time()
+        self._origin = time.perf_counter()
+        self.spans = []
+        self._stack = []
+        self.open(name, attrs)
+
+    def open(self, name, attrs):
+        span = {"span": name, "depth": len(self._stack), "parent": self._stack[-1]["span"] if self._stack else None,
+                "start_ms": (time.perf_counter() - self._origin) * 1000, "duration_ms": None, **attrs}
+        self.spans.append(span)
+        self._stack.append(span)
+        return span
+
+    def close(self, span):
+        span["duration_ms"] = (time.perf_counter() - self._origin) * 1000 - span["start_ms"]
+        if span in self._stack:
+            del self._stack[self._stack.index(span):]
+
+    @property
+    def innermost(self):
+        return self._stack[-1] if self._stack else None
+
+    def finish(self):
+        # Closes the root (and anything left open by an interrupted run)
+        while self._stack:
+            self.close(self._stack[-1])
+        return self
+
+    def records(self):
+        """One dict per span, in start order (durations of still-open spans so far)."""
+        now = (time.perf_counter() - self._origin) * 1000
+        return [
+            {"trace": self.id, "run": self.name, **span,
+             "duration_ms": span["duration_ms"] if span["duration_ms"] is not None else now - span["start_ms"]}
+            for span in self.spans
+        ]
+
+
+def current():
+    return _current.get()
+
+
+def start(name, **attrs):
+    """Begin a trace for the run in this context (replacing any unfinished one) and return it."""
+    trace = Trace(name, **attrs)
+    _current.set(trace)
+    return trace
+
+
+def finish(emit=None):
+    """End the current trace, print it if enabled, and return it (None when not tracing)."""
+    trace = _current.get()
+    if trace is None:
+        return None
+    _current.set(None)
+    trace.finish()
+    if EMIT if emit is None else emit:
+        write(trace)
+    return trace
+
+
+@contextlib.contextmanager
+def run(name, **attrs):
+    """Trace a run; nested inside an active trace it is just a span of that trace."""
+    if _current.get() is not None:
+        with span(name, **attrs) as s:
+            yield s
+        return
+    trace = start(name, **attrs)
+    try:
+        yield trace.innermost
+    finally:
+        if _current.get() is trace:
+            finish()
+
+
+def traced(name):
+    """Decorator form of run(): a fragment rerun alone gets its own trace."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """Time a stage of the current trace; yields a dict for extra attributes (rows, bytes, ...)."""
+    trace = _current.get()
+    if trace is None:
+        yield {}
+        return
+    s = trace.open(name, attrs)
+    try:
+        yield s
+    finally:
+        trace.close(s)
+
+
+def count(name, n=1):
+    """Add ``n`` to a counter (e.g. cache_hits, bytes) on the innermost open span."""
+    trace = _current.get()
+    if trace is not None and trace.innermost is not None:
+        trace.innermost[name] = trace.innermost.get(name, 0) + n
+
+
+def write(trace, stream=None):
+    stream = stream or sys.stdout
+    lines = "".join(
+        json.dumps({"ts": trace.wall_start, **record}, default=str) + "\n" for record in trace.records()
+    )
+    with _emit_lock:
+        stream.write(lines)
+        stream.flush()
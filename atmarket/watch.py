@@ -0,0 +1,68 @@
+# atmarket/watch.py
+# Background watcher for the data directory. When an export is added, replaced or removed
+# it refreshes the historical store in place, so connected sessions pick up new numbers on
+# their next rerun without a container restart.
+
+import logging
+import os
+import threading
+import time
+
+from atmarket import store
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0
+
+_watchers = {}
+_lock = threading.Lock()
+
+
+def _stat_signature(data_dir):
+    signature = []
+    for _, path in store.discover(data_dir):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def _run(data_dir, interval):
+    last = _stat_signature(data_dir)
+    while True:
+        time.sleep(interval)
+        try:
+            current = _stat_signature(data_dir)
+            if current == last:
+                continue
+            # Let the copy finish: only reload once the directory is stable across a poll
+            time.sleep(interval)
+            if _stat_signature(data_dir) != current:
+                continue
+        except OSError as exc:
+            logger.warning("Could not scan %s: %s", data_dir, exc)
+            continue
+        try:
+            store.load_history(data_dir, serve_stale=False)
+            changed = store.cache_stats()["last_changed"]
+            logger.info("Data directory %s changed; refreshed sheets: %s", data_dir, ", ".join(changed) or "none")
+        except Exception:
+            # Typically an invalid or truncated workbook. Sessions keep the previous data, and
+            # the same files are not parsed again until the directory changes
+            logger.exception("Reload of %s failed", data_dir)
+        last = current
+
+
+def start_watcher(data_dir=store.DATA_DIR, interval=POLL_INTERVAL):
+    """Start (once per process) a daemon thread that keeps the store for ``data_dir`` current."""
+    data_dir = os.path.abspath(data_dir)
+    with _lock:
+        thread = _watchers.get(data_dir)
+        if thread is not None and thread.is_alive():
+            return thread
+        thread = threading.Thread(target=_run, args=(data_dir, interval), name=f"data-watcher:{data_dir}", daemon=True)
+        thread.start()
+        _watchers[data_dir] = thread
+        return thread
@@ -0,0 +1,284 @@
+# atmarket/xlsx.py
+# Minimal single-pass xlsx reader: opens the zip once, decodes shared strings once,
+# and parses the requested worksheets into typed DataFrames.
+# A streaming variant iterparses the XML and yields filtered row batches for exports
+# too large to hold in memory.
+
+import io
+import posixpath
+import zipfile
+from array import array
+from xml.etree import ElementTree as ET
+
+import pandas as pd
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+# -----------------------------
+# Workbook structure
+# -----------------------------
+def sheet_paths(zf):
+    """Map sheet name -> zip member path, in workbook order."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{PKG_REL_NS}Relationship")}
+    paths = {}
+    for sheet in workbook.iter(f"{NS}sheet"):
+        target = targets[sheet.get(f"{REL_NS}id")]
+        if target.startswith("/"):
+            paths[sheet.get("name")] = target.lstrip("/")
+        else:
+            paths[sheet.get("name")] = posixpath.normpath(posixpath.join("xl", target))
+    return paths
+
+
+def _si_text(si):
+    # Plain <t> or rich-text runs <r><t>; phonetic hints (<rPh>) are not cell text
+    t = si.find(f"{NS}t")
+    if t is not None:
+        return t.text or ""
+    return "".join(r.findtext(f"{NS}t", "") for r in si.findall(f"{NS}r"))
+
+
+def shared_strings(zf):
+    try:
+        data = zf.read("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    return [_si_text(si) for si in ET.fromstring(data).iter(f"{NS}si")]
+
+
+class SharedStrings:
+    """Shared-string table kept as one text buffer plus offsets instead of a list of str objects."""
+
+    def __init__(self, strings=()):
+        buf = io.StringIO()
+        self._offsets = array("q", [0])
+        for text in strings:
+            self._offsets.append(self._offsets[-1] + buf.write(text))
+        self._buf = buf.getvalue()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._buf[self._offsets[i]:self._offsets[i + 1]]
+
+
+def iter_shared_strings(zf):
+    try:
+        fh = zf.open("xl/sharedStrings.xml")
+    except KeyError:
+        return
+    with fh:
+        events = ET.iterparse(fh, events=("start", "end"))
+        _, root = next(events)
+        for event, elem in events:
+            if event == "end" and elem.tag == f"{NS}si":
+                yield _si_text(elem)
+                root.clear()
+
+
+# -----------------------------
+# Cells and rows
+# -----------------------------
+def _col_index(ref):
+    idx = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _cell_value(c, sst):
+    kind = c.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in c.iter(f"{NS}t"))
+    v = c.find(f"{NS}v")
+    if v is None or v.text is None:
+        return None
+    if kind == "s":
+        return sst[int(v.text)]
+    if kind in ("str", "e"):
+        return v.text
+    if kind == "b":
+        return v.text == "1"
+    num = float(v.text)
+    return int(num) if num.is_integer() else num
+
+
+def _row_values(row, sst):
+    values = []
+    for c in row.iter(f"{NS}c"):
+        ref = c.get("r")
+        if ref:
+            col = _col_index(ref)
+            if col > len(values):
+                values.extend([None] * (col - len(values)))
+        values.append(_cell_value(c, sst))
+    return values
+
+
+def parse_rows(xml_bytes, sst):
+    root = ET.fromstring(xml_bytes)
+    return [_row_values(row, sst) for row in root.iter(f"{NS}row")]
+
+
+def iter_rows(fh, sst):
+    """Yield each worksheet row as a list of values without building the sheet DOM."""
+    sheet_data = None
+    for event, elem in ET.iterparse(fh, events=("start", "end")):
+        if event == "start":
+            if elem.tag == f"{NS}sheetData":
+                sheet_data = elem
+        elif elem.tag == f"{NS}row":
+            yield _row_values(elem, sst)
+            sheet_data.clear()
+
+
+# -----------------------------
+# Typed frames
+# -----------------------------
+def typed_column(values):
+    # Same rule pandas' Excel reader applies: numeric text becomes int64/float64
+    col = pd.Series(values, dtype=object)
+    present = col.notna()
+    if not present.any():
+        return col
+    num = pd.to_numeric(col, errors="coerce")
+    if num[present].isna().any():
+        return col
+    if present.all() and (num % 1 == 0).all():
+        return num.astype("int64")
+    return num.astype("float64")
+
+
+def rows_to_frame(rows, typed=True):
+    if not rows:
+        return pd.DataFrame()
+    header, body = rows[0], rows[1:]
+    width = len(header)
+    body = [r[:width] + [None] * (width - len(r)) for r in body]
+    columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+    if not typed:
+        return pd.DataFrame(body, columns=columns, dtype=object)
+    data = {name: typed_column([r[i] for r in body]) for i, name in enumerate(columns)}
+    return pd.DataFrame(data, columns=columns)
+
+
+# -----------------------------
+# Workbook reader
+# -----------------------------
+def read_workbook(path, sheets=None):
+    """Return {sheet name: DataFrame} for every (or the requested) sheet in one pass over the zip."""
+    with zipfile.ZipFile(path) as zf:
+        paths = sheet_paths(zf)
+        names = list(paths) if sheets is None else list(sheets)
+        missing = [n for n in names if n not in paths]
+        if missing:
+            raise KeyError(f"Worksheet(s) not found in {path}: {', '.join(missing)}")
+        sst = shared_strings(zf)
+        # Parsed serially: ElementTree and the row loops hold the GIL, so a thread pool
+        # measured no faster
+        return {name: rows_to_frame(parse_rows(zf.read(paths[name]), sst)) for name in names}
+
+
+# -----------------------------
+# Streaming reader
+# -----------------------------
+def _row_filter(header, filters):
+    # filters: {column: allowed values}, compared after stripping whitespace;
+    # columns a sheet does not have are ignored for that sheet
+    checks = [
+        (header.index(col), {str(v).strip() for v in allowed})
+        for col, allowed in (filters or {}).items()
+        if col in header
+    ]
+
+    def keep(row):
+        for idx, allowed in checks:
+            value = row[idx] if idx < len(row) else None
+            if value is None or str(value).strip() not in allowed:
+                return False
+        return True
+
+    return keep
+
+
+def stream_workbook(path, sheets=None, filters=None, batch_size=50_000):
+    """Yield (sheet name, DataFrame batch) pairs, keeping only rows that match ``filters``.
+
+    Batches hold the raw cell values (object columns); typing is applied once per sheet
+    by ``read_workbook_streaming`` so a column never flips type between batches. Memory
+    is bounded by the shared-string table plus one batch, regardless of sheet size.
+    """
+    with zipfile.ZipFile(path) as zf:
+        paths = sheet_paths(zf)
+        names = list(paths) if sheets is None else list(sheets)
+        missing = [n for n in names if n not in paths]
+        if missing:
+            raise KeyError(f"Worksheet(s) not found in {path}: {', '.join(missing)}")
+        sst = SharedStrings(iter_shared_strings(zf))
+        for name in names:
+            with zf.open(paths[name]) as fh:
+                rows = iter_rows(fh, sst)
+                header = next(rows, None)
+                if header is None:
+                    yield name, pd.DataFrame()
+                    continue
+                keep = _row_filter([str(h).strip() if h is not None else None for h in header], filters)
+                batch = []
+                emitted = False
+                for row in rows:
+                    if keep(row):
+                        batch.append(row)
+                        if len(batch) >= batch_size:
+                            yield name, rows_to_frame([header] + batch, typed=False)
+                            emitted = True
+                            batch = []
+                if batch or not emitted:
+                    yield name, rows_to_frame([header] + batch, typed=False)
+
+
+def _combine(batches):
+    df = batches[0] if len(batches) == 1 else pd.concat(batches, ignore_index=True)
+    return pd.DataFrame({col: typed_column(df[col].tolist()) for col in df.columns}, columns=df.columns)
+
+
+def read_workbook_streaming(path, sheets=None, filters=None, batch_size=50_000):
+    batches = {}
+    for name, batch in stream_workbook(path, sheets, filters=filters, batch_size=batch_size):
+        batches.setdefault(name, []).append(batch)
+    return {name: _combine(parts) for name, parts in batches.items()}
+
+
+# -----------------------------
+# Change detection
+# -----------------------------
+SHARED_STRINGS = "xl/sharedStrings.xml"
+
+
+def sheet_digests(path):
+    """Per-sheet content digests straight from the zip directory (CRC-32 + size; no decompression).
+
+    Returns {"shared_strings": digest, "sheets": {sheet name: digest}}. A worksheet's
+    decoded values also depend on the shared-string table, so callers should only
+    treat an unchanged sheet digest as unchanged content if the shared-string digest
+    matches too.
+    """
+    with zipfile.ZipFile(path) as zf:
+        paths = sheet_paths(zf)
+        infos = {info.filename: info for info in zf.infolist()}
+
+    def digest(member):
+        info = infos.get(member)
+        return None if info is None else f"{info.CRC:08x}:{info.file_size}"
+
+    return {
+        "shared_strings": digest(SHARED_STRINGS),
+        "sheets": {name: digest(member) for name, member in paths.items()},
+    }
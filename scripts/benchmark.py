@@ -0,0 +1,274 @@
+# scripts/benchmark.py
+# Stage-level benchmarks for the data pipeline behind the dashboard, with a regression check.
+#
+# Each stage is timed on its own (inputs prepared outside the timed region) at several data
+# sizes. Sizes are multiples of the bundled export: its rows replicated across synthetic
+# States/Territories and written to a temporary workbook, so every stage, from reading
+# the xlsx to serialising the charts, sees the larger volume.
+#
+#   python scripts/benchmark.py                      # compare against the saved baseline
+#   python scripts/benchmark.py --save               # record a new baseline
+#   python scripts/benchmark.py --scales 1 10 --tolerance 0.5 --json
+#
+# Stages (in pipeline order):
+#   load       read every worksheet from the xlsx (atmarket.xlsx.read_workbook)
+#   normalise  strip column names and key columns (atmarket.loader.normalise)
+#   parse      currency / percentage / count text to numbers (atmarket.schema.apply_schema)
+#   index      categorical MultiIndex per sheet (atmarket.loader.index_workbook)
+#   filter     AT / All Australia slice of every sheet (atmarket.model.select)
+#   kpis       KPI table from the three Total sheets (atmarket.kpis.build_kpi_table)
+#   format     format_currency / format_number over every KPI row
+#   charts     Vega-Lite spec construction (the report builders, plus one Altair chart as the
+#              dashboard's simulated charts are built) and JSON serialisation
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import altair as alt  # imported up front so its import time is not charged to a stage
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from atmarket.charts import to_spec  # noqa: E402
+from atmarket.cube import build_cube  # noqa: E402
+from atmarket.formatting import format_currency, format_number  # noqa: E402
+from atmarket.kpis import build_kpi_table  # noqa: E402
+from atmarket.loader import DATA_PATH, index_workbook, normalise  # noqa: E402
+from atmarket.model import ALL_AUSTRALIA, AT_CATEGORY, STATE, select  # noqa: E402
+from atmarket.report import function_chart, function_data, spend_chart, spend_data, top10_chart, top10_data  # noqa: E402
+from atmarket.schema import apply_schema  # noqa: E402
+from atmarket.xlsx import read_workbook  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "scripts", "benchmark_baseline.json")
+STAGES = ("load", "normalise", "parse", "index", "filter", "kpis", "format", "charts")
+
+# A stage regresses when it is this much slower than the baseline (relative) and by more
+# than MIN_REGRESSION_MS (absolute, so timer noise on sub-millisecond stages is ignored).
+# Shared CI runners swing by 20-30% between runs even after calibration; tighten with
+# --tolerance on a quiet machine.
+DEFAULT_TOLERANCE = 0.5
+MIN_REGRESSION_MS = 5.0
+
+# Calibration runs interleaved with the stages must agree within this ratio (slowest /
+# fastest) before the baseline is scaled to this machine
+CALIBRATION_SPREAD = 1.3
+
+
+# -----------------------------
+# Data sizes
+# -----------------------------
+def scaled_workbook(source, scale, directory):
+    """Path of a copy of ``source`` with every sheet's rows repeated for ``scale`` states."""
+    if scale == 1:
+        return source
+    raw = read_workbook(source)
+    path = os.path.join(directory, f"bench_x{scale}.xlsx")
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in raw.items():
+            copies = [df]
+            for i in range(1, scale):
+                copy = df.copy()
+                copy[STATE] = copy[STATE].astype(str) + f" {i + 1}"
+                copies.append(copy)
+            pd.concat(copies, ignore_index=True).to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+# -----------------------------
+# Timing
+# -----------------------------
+def timed(fn, setup=lambda: None, repeat=5, warmup=0):
+    """Best wall time of ``fn(setup())`` in ms over ``repeat`` runs (setup and ``warmup``
+    runs not timed), and the last result. The minimum is the run least disturbed by
+    the rest of the machine, so it is the most repeatable figure to compare."""
+    for _ in range(warmup):
+        fn(setup())
+    times, result = [], None
+    for _ in range(repeat):
+        arg = setup()
+        started = time.perf_counter()
+        result = fn(arg)
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times), result
+
+
+def calibrate(repeat=5):
+    """Time (ms) of a fixed reference workload, a mix of interpreter and pandas work like the
+    stages. Baselines are scaled by the ratio to this figure, so a slower or busier machine
+    does not read as a regression."""
+    values = pd.Series([f"${i * 7919 % 100_000:,}.{i % 100:02d}" for i in range(20_000)])
+
+    def work(_):
+        total = sum(i * i for i in range(200_000))
+        parsed = pd.to_numeric(values.str.replace(r"[$,]", "", regex=True))
+        return total, parsed.groupby(parsed.round(-4)).sum()
+
+    return timed(work, repeat=repeat, warmup=1)[0]
+
+
+def item_chart(data):
+    # As the dashboard's simulated "Top 10 AT Support Items" chart: Altair construction + validation
+    return alt.Chart(data).mark_bar(color="#1f77b4").encode(
+        x="Spend", y=alt.Y("Support Item", sort="-x"), tooltip=["Support Item", "Spend"]
+    ).properties(height=300)
+
+
+ITEM_DATA = pd.DataFrame({
+    "Support Item": [
+        "Power wheelchairs", "Manual wheelchairs", "Communication devices (AAC)",
+        "Hearing aids", "Prosthetics", "Orthotics", "Home automation / smart tech",
+        "Beds & mattresses", "Hoists & transfer equipment", "Vision aids"
+    ],
+    "Spend": [580, 420, 360, 310, 290, 250, 200, 180, 150, 120]
+})
+
+
+def copies(frames):
+    return lambda: {name: df.copy() for name, df in frames.items()}
+
+
+def run_stages(path, repeat):
+    """{stage: best ms} for one workbook, running the pipeline stage by stage."""
+    ms = {}
+    ms["load"], raw = timed(lambda _: read_workbook(path), repeat=repeat)
+    ms["normalise"], flat = timed(
+        lambda frames: {name: normalise(df) for name, df in frames.items()}, copies(raw), repeat)
+    ms["parse"], typed = timed(
+        lambda frames: {name: apply_schema(df) for name, df in frames.items()}, copies(flat), repeat)
+    ms["index"], frames = timed(lambda _: index_workbook(typed), repeat=repeat)
+    ms["filter"], _ = timed(
+        lambda _: {name: select(df, AT_CATEGORY, ALL_AUSTRALIA) for name, df in frames.items()}, repeat=repeat)
+    ms["kpis"], table = timed(lambda _: build_kpi_table(frames), repeat=repeat)
+
+    def format_all(_):
+        return ([format_currency(v) for v in table["payments"]],
+                [format_currency(v) for v in table["committed"]],
+                [format_number(v) for v in table["active_participants"]])
+
+    ms["format"], _ = timed(format_all, repeat=repeat)
+
+    cube = build_cube.__wrapped__(frames)
+    period = table["Period"].max()
+    inputs = [
+        (spend_chart, spend_data(frames, AT_CATEGORY, ALL_AUSTRALIA)),
+        (top10_chart, top10_data(50.0)),
+        (function_chart, function_data(cube, AT_CATEGORY, ALL_AUSTRALIA, period)),
+        (item_chart, ITEM_DATA),
+    ]
+    # One untimed run first: Altair compiles its schema validators on first use
+    ms["charts"], _ = timed(
+        lambda _: [json.dumps(to_spec(build(data))) for build, data in inputs], repeat=repeat, warmup=1)
+    ms["rows"] = sum(len(df) for df in raw.values())
+    return ms
+
+
+# -----------------------------
+# Baseline
+# -----------------------------
+def read_baseline(path):
+    """(baseline results, baseline calibration ms), or ({}, None)."""
+    try:
+        with open(path) as fh:
+            saved = json.load(fh)
+        return saved["results"], saved["calibration_ms"]
+    except (OSError, ValueError, KeyError):
+        return {}, None
+
+
+def speed_factor(samples, baseline_calibration):
+    """Multiplier for baseline times on this machine, from calibration runs interleaved with
+    the stages. A single short calibration swings by 2x on a busy or throttled box, so the
+    factor is only applied when the runs agree (CALIBRATION_SPREAD), and never below 1: a
+    run that happens to calibrate fast must not tighten the baseline into false failures."""
+    if not baseline_calibration or max(samples) > min(samples) * CALIBRATION_SPREAD:
+        return 1.0
+    return max(1.0, min(samples) / baseline_calibration)
+
+
+def compare(results, baseline, tolerance, speed=1.0):
+    """[(scale, stage, baseline ms, current ms)] for every stage beyond the tolerance, with
+    baseline times multiplied by ``speed`` (see speed_factor)."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage in STAGES:
+            before = baseline.get(scale, {}).get(stage)
+            before = before * speed if before is not None else None
+            now = stages[stage]
+            if before is not None and now > before * (1 + tolerance) and now - before > MIN_REGRESSION_MS:
+                regressions.append((scale, stage, before, now))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stage-level pipeline benchmarks with a regression check.")
+    parser.add_argument("--workbook", default=os.path.join(ROOT, DATA_PATH), help="export to benchmark on")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50], help="data size multiples")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage (best reported)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline results file")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown per stage before failing (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    samples = [calibrate()]
+    results, paths = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            paths[str(scale)] = scaled_workbook(args.workbook, scale, tmp)
+            results[str(scale)] = run_stages(paths[str(scale)], args.repeat)
+            samples.append(calibrate())
+        baseline, baseline_calibration = read_baseline(args.baseline)
+        speed = speed_factor(samples, baseline_calibration)
+        if not args.save:
+            # A regression has to reproduce: re-run each failing size once and keep the best times
+            for scale in sorted({scale for scale, *_ in compare(results, baseline, args.tolerance, speed)}):
+                rerun = run_stages(paths[scale], args.repeat)
+                results[scale] = {stage: min(ms, rerun[stage]) for stage, ms in results[scale].items()}
+                samples.append(calibrate())
+            speed = speed_factor(samples, baseline_calibration)
+    calibration = min(samples)
+
+    if args.save:
+        with open(args.baseline, "w") as fh:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "pandas": pd.__version__},
+                "repeat": args.repeat,
+                "calibration_ms": calibration,
+                "results": results,
+            }, fh, indent=2)
+            fh.write("\n")
+        baseline, speed = results, 1.0
+
+    regressions = compare(results, baseline, args.tolerance, speed)
+
+    if args.json:
+        print(json.dumps({"calibration_ms": calibration, "calibration_samples": samples, "speed": speed,
+                          "results": results, "regressions": regressions}, indent=2))
+    else:
+        print(f"{'scale':>6} {'rows':>8} " + " ".join(f"{stage:>9}" for stage in STAGES) + "   (best of N, ms)")
+        for scale, stages in results.items():
+            print(f"{scale:>6} {stages['rows']:>8} " + " ".join(f"{stages[stage]:9.1f}" for stage in STAGES))
+            if scale in baseline:
+                print(f"{'base':>6} {'':>8} " + " ".join(
+                    f"{baseline[scale].get(stage, float('nan')) * speed:9.1f}" for stage in STAGES))
+        if baseline:
+            print(f"Baseline scaled by {speed:.2f} (calibration {calibration:.1f} ms on this machine, "
+                  f"runs {', '.join(f'{ms:.1f}' for ms in samples)})")
+        else:
+            print(f"No baseline at {args.baseline}; record one with --save")
+    for scale, stage, before, now in regressions:
+        print(f"FAIL: {stage} at x{scale}: {now:.1f} ms vs baseline {before:.1f} ms "
+              f"(+{(now / before - 1) * 100:.0f}%, tolerance {args.tolerance * 100:.0f}%)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
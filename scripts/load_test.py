@@ -0,0 +1,221 @@
+# scripts/load_test.py
+# Concurrent-session load test for the dashboard, run entirely on the local machine.
+#
+# Drives N headless sessions (Streamlit's AppTest) in one process, the way one server
+# container hosts them: they share the loaded dataset and caches and contend for the same
+# GIL. Each session opens the app, then makes random filter changes and widget interactions,
+# each of which is a script rerun. Reports p50/p95/p99 rerun latency, reruns per second
+# and peak RSS, so replicas can be sized from sessions-per-container:
+#
+#   python scripts/load_test.py --sessions 10 --interactions 20
+#   python scripts/load_test.py --sessions 25 --data-dir /tmp/synthetic --json
+#   python scripts/load_test.py --sessions 10 --p95-budget-ms 1500
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Imported here, before any session thread starts: concurrent first imports of
+# Streamlit / pandas from several threads can see partially initialised modules
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner  # noqa: E402
+
+from atmarket.memory import rss_bytes  # noqa: E402
+
+# Sidebar filters and in-section widgets a viewer changes, by widget label / key
+FILTERS = ("Support Category", "State/Territory", "Period")
+WIDGETS = ("thin_threshold", "regional_view")
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values`` (q in 0-100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+class Sampler(threading.Thread):
+    """Records the process's peak RSS while the load runs."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# -----------------------------
+# Session
+# -----------------------------
+def share_runtime():
+    """Let AppTest sessions run in parallel threads, sharing what a server process shares.
+
+    Each AppTest run installs a mock Runtime singleton and clears it when the run ends,
+    which would pull it from under any other session still running; fall back to the
+    last mock installed instead. Runs also share one compiled-script cache, as sessions
+    on a server do (rather than each recompiling the script on every rerun).
+    """
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    last = [None]
+    instance = Runtime.instance.__func__
+
+    def shared_instance(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        elif last[0] is not None:
+            return last[0]
+        return instance(cls)
+
+    Runtime.instance = classmethod(shared_instance)
+
+
+def interact(at, rng):
+    """Apply one random viewer action to ``at``; returns a short description of it."""
+    choices = []
+    for label in FILTERS:
+        for box in at.sidebar.selectbox:
+            if box.label == label and len(box.options) > 1:
+                choices.append(("select", box))
+    for key in WIDGETS:
+        try:
+            choices.append(("widget", at.slider(key=key) if key == "thin_threshold" else at.radio(key=key)))
+        except KeyError:
+            pass
+    if not choices:
+        return "rerun"
+    kind, widget = rng.choice(choices)
+    if kind == "select":
+        widget.select(rng.choice([o for o in widget.options if o != str(widget.value)] or widget.options))
+    elif widget.type == "slider":
+        widget.set_value(rng.randrange(int(widget.min), int(widget.max) + 1, int(widget.step)))
+    else:
+        widget.set_value(rng.choice(widget.options))
+    return widget.label if kind == "select" else widget.key
+
+
+def session(app, interactions, seed, start, results):
+    rng = random.Random(seed)
+    at = AppTest.from_file(app, default_timeout=300)
+    start.wait()
+    for step in range(interactions + 1):
+        action = "open" if step == 0 else None
+        started = time.perf_counter()
+        try:
+            action = action or interact(at, rng)
+            started = time.perf_counter()
+            at.run()
+            error = at.exception[0].message if at.exception else None
+        except Exception as exc:  # timeouts, or a widget the interaction expected is gone
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - started
+        results.append({"session": seed, "action": action, "ms": elapsed * 1000, "error": error})
+        if error:
+            return
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def run(app, sessions, interactions, seed):
+    """Run the load; returns the report dict."""
+    results, start = [], threading.Event()
+    threads = [
+        threading.Thread(target=session, args=(app, interactions, seed + i, start, results), daemon=True)
+        for i in range(sessions)
+    ]
+    sampler = Sampler()
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    sampler.stop()
+
+    first = [r["ms"] for r in results if not r["error"] and r["action"] == "open"]
+    reruns = [r["ms"] for r in results if not r["error"] and r["action"] != "open"]
+    return {
+        "app": os.path.relpath(app, ROOT),
+        "sessions": sessions,
+        "interactions": interactions,
+        "reruns": len(results),
+        "errors": [r["error"] for r in results if r["error"]],
+        "wall_s": wall,
+        "throughput_rps": len(results) / wall if wall else float("nan"),
+        "open_ms": {f"p{q}": percentile(first, q) for q in (50, 95, 99)},
+        "rerun_ms": {f"p{q}": percentile(reruns, q) for q in (50, 95, 99)},
+        "rerun_max_ms": max(reruns, default=float("nan")),
+        "peak_rss_mb": sampler.peak / 2**20,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard.")
+    parser.add_argument("--app", default="streamlit_app.py", help="entry point to drive")
+    parser.add_argument("--data-dir", help="dataset to serve (default: the app's data/ directory)")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--interactions", type=int, default=20, help="widget interactions per session")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the interaction sequences")
+    parser.add_argument("--warmup", action=argparse.BooleanOptionalAction, default=True,
+                        help="run the app once first so the load measures warm sessions")
+    parser.add_argument("--p95-budget-ms", type=float, help="fail when p95 rerun latency exceeds this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        os.environ["ATMARKET_DATA_DIR"] = os.path.abspath(args.data_dir)
+    os.chdir(ROOT)  # the app resolves data/ relative to the working directory
+    logging.disable(logging.WARNING)  # AppTest logs a warning per session thread
+    share_runtime()
+    app = os.path.join(ROOT, args.app)
+
+    if args.warmup:
+        # Ingest and derive once, as a running server would have before real traffic arrives
+        run(app, 1, 0, args.seed - 1)
+    report = run(app, args.sessions, args.interactions, args.seed)
+    report["p95_budget_ms"] = args.p95_budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['sessions']} sessions x {report['interactions']} interactions on {report['app']}")
+        print(f"  reruns      : {report['reruns']} in {report['wall_s']:.1f}s "
+              f"({report['throughput_rps']:.1f}/s)")
+        for name in ("open_ms", "rerun_ms"):
+            p = report[name]
+            print(f"  {name[:-3]:<11} : p50 {p['p50']:7.0f} ms | p95 {p['p95']:7.0f} ms | p99 {p['p99']:7.0f} ms")
+        print(f"  peak RSS    : {report['peak_rss_mb']:.0f} MB")
+    if report["errors"]:
+        print(f"FAIL: {len(report['errors'])} session(s) raised: {report['errors'][0]}", file=sys.stderr)
+        return 1
+    if args.p95_budget_ms is not None and report["rerun_ms"]["p95"] > args.p95_budget_ms:
+        print(f"FAIL: p95 rerun {report['rerun_ms']['p95']:.0f} ms exceeds budget {args.p95_budget_ms:.0f} ms",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
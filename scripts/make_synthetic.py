@@ -0,0 +1,73 @@
+# scripts/make_synthetic.py
+# Write a synthetic Data Explorer export (atmarket.synthetic) for scale testing: the same
+# 24 sheets and columns as the real one, sized by --scale (multiples of the bundled
+# export) or explicitly by periods / states / categories / segment cardinality.
+#
+#   python scripts/make_synthetic.py --scale 100                     # synthetic/Explore_Data_2025_09_18.xlsx
+#   python scripts/make_synthetic.py --periods 8 --states 9 --categories 4 --out /tmp/big
+#   python scripts/make_synthetic.py --scale 10 --parquet /tmp/big-parquet --no-xlsx
+#
+# The output directory can be served or measured like data/:
+#
+#   ATMARKET_DATA_DIR=synthetic streamlit run streamlit_app.py
+#   python scripts/load_test.py --data-dir synthetic
+#   python scripts/benchmark.py --workbook synthetic/Explore_Data_2025_09_18.xlsx --scales 1
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from atmarket import synthetic  # noqa: E402
+
+DEFAULT_NAME = "Explore_Data_2025_09_18.xlsx"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic Data Explorer export for scale testing.")
+    parser.add_argument("--out", default="synthetic", help="output directory for the xlsx")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="workbook file name (Explore_Data_YYYY_MM_DD.xlsx)")
+    parser.add_argument("--scale", type=float, help="size as a multiple of the bundled export (overrides the shape)")
+    parser.add_argument("--periods", type=int, default=4, help="quarters of history, ending Q4 FY24/25")
+    parser.add_argument("--states", type=int, default=1, help="States/Territories, including All Australia")
+    parser.add_argument("--categories", type=int, default=2, help="support categories, including All and AT")
+    parser.add_argument("--segment-factor", type=int, default=1, help="multiplier on every dimension's segments")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--no-thousands", dest="thousands", action="store_false",
+                        help='write currency as "$1234.56" (as the bundled export does) instead of "$1,234.56"')
+    parser.add_argument("--parquet", metavar="DIR", help="also write one typed Parquet file per sheet to DIR")
+    parser.add_argument("--no-xlsx", dest="xlsx", action="store_false", help="skip the xlsx (with --parquet)")
+    args = parser.parse_args(argv)
+
+    if args.scale is not None:
+        shape = synthetic.params_for_scale(args.scale)
+    else:
+        shape = {"periods": args.periods, "states": args.states, "categories": args.categories,
+                 "segment_factor": args.segment_factor}
+    if min(shape.values()) < 1:
+        parser.error("--periods, --states, --categories and --segment-factor must be at least 1")
+    if not args.xlsx and not args.parquet:
+        parser.error("nothing to write: --no-xlsx needs --parquet")
+
+    started = time.perf_counter()
+    frames = synthetic.generate(**shape, seed=args.seed, thousands=args.thousands)
+    rows = sum(len(df) for df in frames.values())
+    print(", ".join(f"{key.replace('_', ' ')} {value}" for key, value in shape.items())
+          + f" -> {rows:,} rows ({rows / synthetic.REAL_ROWS:.1f}x the bundled export)")
+    if args.xlsx:
+        os.makedirs(args.out, exist_ok=True)
+        path = synthetic.write_xlsx(frames, os.path.join(args.out, args.name))
+        print(f"  {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
+    if args.parquet:
+        paths = synthetic.write_parquet(frames, args.parquet)
+        size = sum(os.path.getsize(p) for p in paths.values())
+        print(f"  {args.parquet}/ ({len(paths)} Parquet files, {size / 2**20:.1f} MB)")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# scripts/render_reports.py
+# Headless batch renderer: one static one-pager (KPIs + charts) per State/Territory x Period
+# for a Support Category, written to <out>/<category>/<state>/<period>.html (self-contained)
+# and optionally .png / .pdf (needs the vl-convert package).
+#
+# The data is loaded once in the parent and shared with a process pool (forked workers
+# inherit it; spawned workers read the memory-mapped Parquet store). Reports whose inputs
+# (data version, renderer code, slice, formats) are unchanged since the last run are skipped:
+#
+#   python scripts/render_reports.py --out reports
+#   python scripts/render_reports.py --out reports --format html png pdf --workers 8
+#   python scripts/render_reports.py --category All --force
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from atmarket import report  # noqa: E402
+from atmarket.cube import build_cube  # noqa: E402
+from atmarket.kpis import slice_options  # noqa: E402
+from atmarket.model import AT_CATEGORY  # noqa: E402
+from atmarket.store import DATA_DIR, data_version, load_history  # noqa: E402
+
+MANIFEST = "manifest.json"
+
+PACKAGE = os.path.dirname(os.path.abspath(report.__file__))
+
+
+def code_version():
+    # Any atmarket module (KPIs, deltas, cube, schema, ...) can change the output, as can
+    # this script and whether vl-convert is there to inline the Vega libraries
+    digest = hashlib.sha1(str(report.images_available()).encode())
+    paths = sorted(os.path.join(PACKAGE, name) for name in os.listdir(PACKAGE) if name.endswith(".py"))
+    for path in paths + [os.path.abspath(__file__)]:
+        with open(path, "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def slug(text):
+    # "Q4 FY24/25" -> "Q4_FY24-25"; "All Australia" -> "All_Australia"
+    return re.sub(r"[^0-9A-Za-z.-]+", "_", str(text).replace("/", "-")).strip("_")
+
+
+def input_hash(data, code, category, state, period, formats):
+    key = json.dumps([data, code, category, state, str(period), sorted(formats)])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+_data_dir = DATA_DIR
+
+
+def _init(data_dir):
+    global _data_dir
+    _data_dir = data_dir
+
+
+def render(job):
+    """Write one report; returns (relative html path, seconds)."""
+    out_dir, category, state, period, formats = job
+    started = time.perf_counter()
+    frames = load_history(_data_dir)  # already cached in forked workers
+    page = report.one_pager(frames, category, state, period)
+    base = os.path.join(out_dir, slug(category), slug(state), slug(period))
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    if "html" in formats:
+        with open(base + ".html", "w", encoding="utf-8") as fh:
+            fh.write(report.to_html(page))
+    for fmt in report.IMAGE_FORMATS:
+        if fmt in formats:
+            with open(f"{base}.{fmt}", "wb") as fh:
+                fh.write(report.to_image(page, fmt))
+    return os.path.relpath(base, out_dir), time.perf_counter() - started
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a static one-pager for every State/Territory x Period.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory holding the Data Explorer exports")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--category", default=AT_CATEGORY, help="Support Category to report on")
+    parser.add_argument("--format", nargs="+", default=["html"], choices=["html", *report.IMAGE_FORMATS],
+                        dest="formats", help="output formats")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--force", action="store_true", help="re-render even if inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    if set(args.formats) & set(report.IMAGE_FORMATS) and not report.images_available():
+        parser.error("PNG/PDF output needs the vl-convert package (pip install vl-convert-python)")
+
+    started = time.perf_counter()
+    data_dir = os.path.abspath(args.data_dir)
+    frames = load_history(data_dir)
+    build_cube(frames)  # derived once here, inherited by forked workers
+    options = slice_options(frames)
+    slices = [(state, period) for (category, state), periods in options.items()
+              if category == args.category for period in periods]
+    if not slices:
+        parser.error(f"No data for Support Category {args.category!r}")
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST)
+    try:
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        manifest = {}
+
+    data, code = data_version(data_dir), code_version()
+    jobs, hashes, skipped = [], {}, 0
+    for state, period in sorted(slices, key=lambda sp: (sp[0], sp[1])):
+        name = os.path.join(slug(args.category), slug(state), slug(period))
+        digest = input_hash(data, code, args.category, state, period, args.formats)
+        outputs = [os.path.join(args.out, f"{name}.{fmt}") for fmt in args.formats]
+        if not args.force and manifest.get(name) == digest and all(map(os.path.exists, outputs)):
+            skipped += 1
+            continue
+        hashes[name] = digest
+        jobs.append((args.out, args.category, state, period, tuple(args.formats)))
+
+    rendered = []
+    if jobs:
+        # Fork where available so workers start with the loaded frames and derived results
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        workers = max(1, min(args.workers or 1, len(jobs)))
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init, initargs=(data_dir,)) as pool:
+            for name, seconds in pool.map(render, jobs):
+                rendered.append((name, seconds))
+                manifest[name] = hashes[name]
+
+    with open(manifest_path, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+
+    for name, seconds in rendered:
+        print(f"  {name:<40} {seconds * 1000:8.0f} ms")
+    print(f"Rendered {len(rendered)}, skipped {skipped} unchanged, "
+          f"in {time.perf_counter() - started:.1f}s -> {os.path.abspath(args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# scripts/startup_profile.py
+# Cold-start report for the dashboard entry point.
+#
+# Runs the app once in a fresh interpreter under `python -X importtime` (headless, via
+# Streamlit's AppTest), then reports wall time for importing Streamlit and for the first
+# script run, plus the heaviest imports grouped by top-level package. Exits non-zero when
+# the cold start exceeds the budget, so CI can enforce it:
+#
+#   python scripts/startup_profile.py --budget-ms 6000
+#   python scripts/startup_profile.py --json
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start (Streamlit import + first full script run) allowed on a dev laptop / CI runner
+DEFAULT_BUDGET_MS = 5000
+
+_DRIVER = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+if at.exception:
+    raise SystemExit("App raised: " + at.exception[0].message)
+print(json.dumps({"streamlit_import_ms": (t1 - t0) * 1000, "first_run_ms": (t2 - t1) * 1000}))
+"""
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """{top-level package: cumulative ms} for imports made directly by the profiled code."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m is None:
+            continue
+        _, cumulative, indent, name = m.groups()
+        if indent:  # nested import, already counted in its parent's cumulative time
+            continue
+        totals[name.split(".")[0]] += int(cumulative) / 1000
+    return dict(totals)
+
+
+def profile(app):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _DRIVER, app],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(proc.returncode)
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    timings["cold_start_ms"] = timings["streamlit_import_ms"] + timings["first_run_ms"]
+    timings["imports_ms"] = parse_importtime(proc.stderr)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start report and budget check for the dashboard entry point.")
+    parser.add_argument("--app", default="streamlit_app.py", help="entry point to profile")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail above this cold start")
+    parser.add_argument("--top", type=int, default=12, help="number of packages to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = profile(os.path.join(ROOT, args.app))
+    report["budget_ms"] = args.budget_ms
+    report["within_budget"] = report["cold_start_ms"] <= args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Cold start for {args.app}")
+        print(f"  import streamlit : {report['streamlit_import_ms']:8.0f} ms")
+        print(f"  first script run : {report['first_run_ms']:8.0f} ms")
+        print(f"  total            : {report['cold_start_ms']:8.0f} ms  (budget {args.budget_ms:.0f} ms)")
+        print("Heaviest imports (cumulative):")
+        ranked = sorted(report["imports_ms"].items(), key=lambda kv: kv[1], reverse=True)
+        for name, ms in ranked[: args.top]:
+            print(f"  {name:<24} {ms:8.1f} ms")
+    if not report["within_budget"]:
+        print(f"FAIL: cold start {report['cold_start_ms']:.0f} ms exceeds budget {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
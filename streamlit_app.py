@@ -2,137 +2,146 @@
 # Assistive Technology Market Snapshot - Section-based colour themes (plots only)
 
 import streamlit as st
-import pandas as pd
-import altair as alt
 
 # -----------------------------
 # Page Config (wide layout)
 # -----------------------------
+# Sent before the heavy imports below so the page shell is up while they load
 st.set_page_config(page_title="AT Market Snapshot", layout="wide")
 
+import time  # noqa: E402
+
+rerun_started = time.perf_counter()
+
+from atmarket import trace  # noqa: E402
+
+# Spans for each stage of this run: shown in the sidebar "Rerun trace" panel, and logged
+# as JSON lines on stdout when ATMARKET_TRACE=1
+trace.start("rerun")
+
+import pandas as pd  # noqa: E402
+
+from atmarket.charts import chart_spec, spec_cache_stats  # noqa: E402
+from atmarket.concentration import (  # noqa: E402
+    CONCENTRATION, DIMENSION, THIN_MARKET_THRESHOLD, concentration_table, thin_market_share, thin_markets
+)
+from atmarket.cube import REMOTENESS_GROUPS, build_cube, segment_label  # noqa: E402
+from atmarket.formatting import format_currency, format_delta, format_number, format_percent  # noqa: E402
+from atmarket.kpis import headline_deltas, headline_kpis, slice_options  # noqa: E402
+from atmarket.lazy import lazy_import  # noqa: E402
+from atmarket.memory import record_baseline, session_memory  # noqa: E402
+from atmarket.model import ALL_AUSTRALIA, AT_CATEGORY, category_label, category_title  # noqa: E402
+from atmarket.report import (  # noqa: E402
+    disability_chart, disability_data, function_chart, function_data, regional_chart, regional_data,
+    spend_chart, spend_data, top10_chart, top10_data
+)
+from atmarket.query import QueryError, query, query_available, tables  # noqa: E402
+from atmarket.store import DATA_DIR, cache_stats, load_history  # noqa: E402
+from atmarket.watch import start_watcher  # noqa: E402
+
+# Altair (and its jsonschema stack) is only imported when the first chart is built,
+# after the header and KPIs have already been sent
+alt = lazy_import("altair")
+
 # -----------------------------
 # Helpers
 # -----------------------------
-def format_currency(value):
-    try:
-        value = float(str(value).replace(",", "").replace("$", ""))
-    except:
-        return str(value)
-    if abs(value) >= 1_000_000_000:
-        return f"${value/1_000_000_000:.2f}B"
-    elif abs(value) >= 1_000_000:
-        return f"${value/1_000_000:.2f}M"
-    elif abs(value) >= 1_000:
-        return f"${value/1_000:.2f}K"
-    else:
-        return f"${value:.2f}"
-
-def format_number(value):
-    try:
-        value = int(value)
-        return f"{value:,}"
-    except:
-        return str(value)
+def show_chart(build, data, **params):
+    # Compiled spec reused across reruns and sessions while data and definition are unchanged
+    with trace.span("chart", chart=build.__name__):
+        st.vega_lite_chart(chart_spec(build, data, **params), use_container_width=True)
 
 # -----------------------------
 # Load data
 # -----------------------------
-DATA_PATH = "data/Explore_Data_2025_09_18.xlsx"
-
-market_total = pd.read_excel(DATA_PATH, sheet_name="Market by Total")
-participants_total = pd.read_excel(DATA_PATH, sheet_name="ActPrtpnt by Total")
-providers_total = pd.read_excel(DATA_PATH, sheet_name="Provider by Total")
-
-# Normalise column names
-for df in [market_total, participants_total, providers_total]:
-    df.columns = df.columns.str.strip()
-    df["Support Category"] = df["Support Category"].astype(str).str.strip()
-    df["State/Territory"] = df["State/Territory"].astype(str).str.strip()
-
-# Filter: AT only + All Australia
-market_at_all = market_total[
-    (market_total["Support Category"] == "Capital - Assistive Technology") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
-participants_at_all = participants_total[
-    (participants_total["Support Category"] == "Capital - Assistive Technology") &
-    (participants_total["State/Territory"] == "All Australia")
-].copy()
-providers_at_all = providers_total[
-    (providers_total["Support Category"] == "Capital - Assistive Technology") &
-    (providers_total["State/Territory"] == "All Australia")
-].copy()
-
-# Also get ALL supports for comparison
-market_all_supports = market_total[
-    (market_total["Support Category"] == "All") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
-
-# Latest period
-latest_period = market_at_all["Period"].unique().max()
-market_at = market_at_all[market_at_all["Period"] == latest_period]
-participants_at = participants_at_all[participants_at_all["Period"] == latest_period]
-providers_at = providers_at_all[providers_at_all["Period"] == latest_period]
-market_all_supports_latest = market_all_supports[market_all_supports["Period"] == latest_period]
-
-# Extract latest values
-payments = market_at["Payments"].iloc[0]
-committed = market_at["Committed supports"].iloc[0]
-utilisation = f"{market_at['Utilisation'].iloc[0]}%"
-
-active_participants = participants_at["Active participants"].iloc[0]
-avg_committed = participants_at["Average committed support"].iloc[0]
-avg_payments = participants_at["Average payments"].iloc[0]
-active_providers = providers_at["Active provider"].iloc[0]
-
-# Clean numeric fields
-def clean_currency(series):
-    return series.replace('[\$,]', '', regex=True).astype(float)
-
-market_at_all["Payments_num"] = clean_currency(market_at_all["Payments"])
-market_all_supports["Payments_num"] = clean_currency(market_all_supports["Payments"])
+# Every Explore_Data_YYYY_MM_DD.xlsx in data/, consolidated once per process and shared
+# across reruns; dropping in a new export ingests just that file. The watcher refreshes
+# the store in the background, re-ingesting only the sheets that changed.
+with trace.span("load") as span:
+    start_watcher(DATA_DIR)
+    sheets = load_history(DATA_DIR)
+    span["rows"] = sum(len(df) for df in sheets.values())
+
+with trace.span("derive"):
+    # Long-format segment cube over the 21 "by <dimension>" sheets (built once per data version)
+    cube = build_cube(sheets)
+
+    # Top-10 provider share for every market segment, ranked and flagged (built once per data version)
+    concentration = concentration_table(sheets)
+
+# -----------------------------
+# Selectors
+# -----------------------------
+# Options come from the KPI table's index, so switching never touches the workbook
+with trace.span("filter") as span:
+    options = slice_options(sheets)
+    categories = sorted({c for c, _ in options})
+    states = sorted({s for _, s in options}, key=lambda s: (s != ALL_AUSTRALIA, s))
+
+    st.sidebar.markdown("### Filters")
+    category = st.sidebar.selectbox(
+        "Support Category", categories,
+        index=categories.index(AT_CATEGORY) if AT_CATEGORY in categories else 0
+    )
+    state_choices = [s for s in states if (category, s) in options]
+    state = st.sidebar.selectbox("State/Territory", state_choices)
+    periods = options[(category, state)]
+    period = st.sidebar.selectbox("Period", periods[::-1], format_func=str)
+    span["rows"] = len(options)
+
+# KPIs: one keyed lookup into the table materialised at ingest
+with trace.span("kpis", rows=1):
+    kpis = headline_kpis(sheets, category, state, period)
+    latest_period = kpis["period"]
+    deltas = headline_deltas(sheets, category, state, latest_period)
+payments = kpis["payments"]
+committed = kpis["committed"]
+utilisation = format_percent(kpis["utilisation"])
+
+active_participants = kpis["active_participants"]
+avg_committed = kpis["avg_committed"]
+avg_payments = kpis["avg_payments"]
+active_providers = kpis["active_providers"]
 
 # % share of total
-at_share_payments = (
-    clean_currency(market_at["Payments"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Payments"]).iloc[0] * 100
-)
-at_share_committed = (
-    clean_currency(market_at["Committed supports"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Committed supports"]).iloc[0] * 100
-)
+at_share_payments = kpis["share_payments"]
+at_share_committed = kpis["share_committed"]
 
 # Participants per provider
-ppp = round(active_participants / active_providers, 1) if active_providers > 0 else 0
+ppp = kpis["ppp"]
+
+# Share of payments going to the top 10 providers
+top10_share = kpis["market_concentration"]
 
 # -----------------------------
 # HEADER
 # -----------------------------
 st.markdown(
-    "<h1 style='color:#4B2E83; text-align:center;'>Assistive Technology Market Snapshot</h1>",
+    f"<h1 style='color:#4B2E83; text-align:center;'>{category_title(category)} Market Snapshot</h1>",
     unsafe_allow_html=True
 )
-st.caption(f"{latest_period} | Source: NDIA internal data (Capital – Assistive Technology, All Australia)")
+st.caption(f"{latest_period} | Source: NDIA internal data ({category.replace(' - ', ' – ')}, {state})")
 
 # -----------------------------
-# ROW 1: Expenditure (blues) + Participants (greens)
+# Sections
 # -----------------------------
-row1_col1, row1_col2 = st.columns(2)
+# Each section is a fragment: a widget inside one re-runs only that section, reading the
+# shared inputs loaded above. Sidebar filters still re-run the whole page.
 
-with row1_col1:
+# ROW 1: Expenditure (blues) + Participants (greens)
+@st.fragment
+@trace.traced("section:expenditure")
+def expenditure_section():
     st.markdown("### 💰 Expenditure")
     col1, col2, col3 = st.columns(3)
-    col1.metric("AT Payments", format_currency(payments), f"{at_share_payments:.1f}% of total")
-    col2.metric("AT Committed Supports", format_currency(committed), f"{at_share_committed:.1f}% of total")
-    col3.metric("Utilisation", utilisation)
+    col1.metric(category_label(category, "{} Payments"), format_currency(payments), format_delta(deltas, "payments"),
+                help=f"{at_share_payments:.1f}% of total")
+    col2.metric(category_label(category, "{} Committed Supports"), format_currency(committed),
+                format_delta(deltas, "committed"),
+                help=f"{at_share_committed:.1f}% of total")
+    col3.metric("Utilisation", utilisation, format_delta(deltas, "utilisation"))
 
-    spend_chart = alt.Chart(market_at_all).mark_area(opacity=0.6, color="#1f77b4").encode(
-        x="Period",
-        y=alt.Y("Payments_num", title="AT Payments ($)"),
-        tooltip=["Period", "Payments"]
-    ).properties(height=200)
-    st.altair_chart(spend_chart, use_container_width=True)
+    show_chart(spend_chart, spend_data(sheets, category, state), category=category)
 
     st.write("**Top 10 AT Support Items by Spend (simulated)**")
     item_data = pd.DataFrame({
@@ -143,68 +152,56 @@ with row1_col1:
         ],
         "Spend": [580, 420, 360, 310, 290, 250, 200, 180, 150, 120]
     })
-    item_chart = alt.Chart(item_data).mark_bar(color="#1f77b4").encode(
-        x="Spend", y=alt.Y("Support Item", sort="-x"), tooltip=["Support Item", "Spend"]
-    ).properties(height=300)
-    st.altair_chart(item_chart, use_container_width=True)
-
-with row1_col2:
+    def item_chart(data):
+        return alt.Chart(data).mark_bar(color="#1f77b4").encode(
+            x="Spend", y=alt.Y("Support Item", sort="-x"), tooltip=["Support Item", "Spend"]
+        ).properties(height=300)
+    show_chart(item_chart, item_data)
+
+@st.fragment
+@trace.traced("section:participants")
+def participants_section():
     st.markdown("### 👥 Participants")
     complex_share = 30  # simulated %
     median_spend = "$3.2K"  # simulated
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Active AT Participants", format_number(active_participants))
+    col1.metric(category_label(category, "Active {} Participants"), format_number(active_participants),
+                format_delta(deltas, "active_participants"))
     col2.metric("Complex AT Users", f"{complex_share}%", "share of AT participants")
     col3.metric("Median AT Spend", median_spend)
 
     comp_data = pd.DataFrame({"Type": ["Simple Users", "Complex Users"], "Share": [70, 30]})
-    comp_chart = alt.Chart(comp_data).mark_arc(innerRadius=50).encode(
-        theta="Share",
-        color=alt.Color("Type", scale=alt.Scale(scheme="greens")),
-        tooltip=["Type", "Share"]
-    ).properties(title="AT User Complexity (simulated)")
-    st.altair_chart(comp_chart, use_container_width=True)
+    def comp_chart(data):
+        return alt.Chart(data).mark_arc(innerRadius=50).encode(
+            theta="Share",
+            color=alt.Color("Type", scale=alt.Scale(scheme="greens")),
+            tooltip=["Type", "Share"]
+        ).properties(title="AT User Complexity (simulated)")
+    show_chart(comp_chart, comp_data)
 
     spend_data = pd.DataFrame({
         "Level": ["Low (<$1K)", "Moderate ($1K–10K)", "High (>$10K)"],
         "Participants": [50000, 30000, 10000]
     })
-    spend_chart = alt.Chart(spend_data).mark_bar().encode(
-        x="Participants",
-        y=alt.Y("Level", sort=["Low (<$1K)", "Moderate ($1K–10K)", "High (>$10K)"]),
-        color=alt.value("#2ca02c"),
-        tooltip=["Level", "Participants"]
-    ).properties(title="AT Spend Intensity (simulated)", height=200)
-    st.altair_chart(spend_chart, use_container_width=True)
-
-    func_data = pd.DataFrame({
-        "Domain": ["Mobility", "Communication", "Self-care", "Vision/Hearing", "Cognition", "Combined"],
-        "Participants": [35000, 20000, 15000, 10000, 5000, 5300]
-    })
-    func_chart = alt.Chart(func_data).mark_bar(color="#2ca02c").encode(
-        x="Participants", y=alt.Y("Domain", sort="-x"), tooltip=["Domain", "Participants"]
-    ).properties(title="Functional Domains of AT Use (simulated)", height=200)
-    st.altair_chart(func_chart, use_container_width=True)
-
-    dis_data = pd.DataFrame({
-        "Disability": ["Cerebral palsy", "Autism", "MS", "Intellectual disability", "Hearing impairment", "Other"],
-        "Participants": [20000, 15000, 8000, 12000, 9000, 26300]
-    })
-    dis_chart = alt.Chart(dis_data).mark_circle(size=100, color="#2ca02c").encode(
-        x="Participants", y=alt.Y("Disability", sort="-x"), tooltip=["Disability", "Participants"]
-    ) + alt.Chart(dis_data).mark_rule(color="#2ca02c").encode(
-        x="Participants", y=alt.Y("Disability", sort="-x")
-    )
-    st.altair_chart(dis_chart.properties(title="AT Participants by Primary Disability (simulated)"),
-                    use_container_width=True)
+    def intensity_chart(data):
+        return alt.Chart(data).mark_bar().encode(
+            x="Participants",
+            y=alt.Y("Level", sort=["Low (<$1K)", "Moderate ($1K–10K)", "High (>$10K)"]),
+            color=alt.value("#2ca02c"),
+            tooltip=["Level", "Participants"]
+        ).properties(title="AT Spend Intensity (simulated)", height=200)
+    show_chart(intensity_chart, spend_data)
 
-# -----------------------------
-# ROW 2: Market Dynamics (oranges) + Providers (purples)
-# -----------------------------
-row2_col1, row2_col2 = st.columns(2)
+    # From ActPrtpnt by Level of Function / Primary Disability
+    show_chart(function_chart, function_data(cube, category, state, latest_period), category=category)
+    show_chart(disability_chart, disability_data(cube, category, state, latest_period), category=category)
 
-with row2_col1:
+
+# ROW 2: Market Dynamics (oranges) + Providers (purples)
+@st.fragment
+@trace.traced("section:market_dynamics")
+def market_dynamics_section():
     st.markdown("### 📈 Market Dynamics")
     k1, k2, k3, k4 = st.columns(4)
     k1.metric("Median Delivery Time", "44 days", "-2 vs last year")
@@ -213,65 +210,162 @@ with row2_col1:
     k4.metric("Innovation Uptake", "3.5%", "↑ trend")
 
     uptake_data = pd.DataFrame({"Quarter": ["Q1", "Q2", "Q3", "Q4"], "Uptake": [2.1, 2.9, 3.2, 3.5]})
-    uptake_chart = alt.Chart(uptake_data).mark_line(point=True, color="#ff7f0e").encode(
-        x="Quarter", y=alt.Y("Uptake", title="% of AT Spend"), tooltip=["Quarter", "Uptake"]
-    ).properties(title="Innovation Uptake Trend", height=200)
-    st.altair_chart(uptake_chart, use_container_width=True)
+    def uptake_chart(data):
+        return alt.Chart(data).mark_line(point=True, color="#ff7f0e").encode(
+            x="Quarter", y=alt.Y("Uptake", title="% of AT Spend"), tooltip=["Quarter", "Uptake"]
+        ).properties(title="Innovation Uptake Trend", height=200)
+    show_chart(uptake_chart, uptake_data)
 
     regional_times = pd.DataFrame({"Region": ["Metro", "Regional", "Remote"], "Days": [38, 46, 54]})
-    reg_chart2 = alt.Chart(regional_times).mark_bar(color="#ff7f0e").encode(
-        x="Days", y="Region", tooltip=["Region", "Days"]
-    ).properties(title="Average Delivery Times by Region (days)", height=200)
-    st.altair_chart(reg_chart2, use_container_width=True)
-
-    top5_data = pd.DataFrame({"Group": ["Top 5 Providers", "All Others"], "Share": [45, 55]})
-    top5_chart = alt.Chart(top5_data).mark_arc(innerRadius=50).encode(
-        theta="Share",
-        color=alt.Color("Group", scale=alt.Scale(scheme="oranges")),
-        tooltip=["Group", "Share"]
-    ).properties(title="Market Concentration: Top 5 Providers")
-    st.altair_chart(top5_chart, use_container_width=True)
-
-with row2_col2:
+    def times_chart(data):
+        return alt.Chart(data).mark_bar(color="#ff7f0e").encode(
+            x="Days", y="Region", tooltip=["Region", "Days"]
+        ).properties(title="Average Delivery Times by Region (days, simulated)", height=200)
+    show_chart(times_chart, regional_times)
+
+    # From Market by Total: share of payments received by the top 10 providers
+    show_chart(top10_chart, top10_data(top10_share))
+
+    # Thin-market scan across every Market by <segment> sheet
+    threshold = st.slider("Thin-market threshold (top-10 share, %)", 50, 100,
+                          int(THIN_MARKET_THRESHOLD), step=5, key="thin_threshold")
+    thin_count, segment_count = thin_market_share(concentration, category, state, latest_period, threshold)
+    st.caption(f"Thin markets: {thin_count} of {segment_count} segments have "
+               f"≥{threshold}% of payments going to the top 10 providers")
+    thin = thin_markets(concentration, category, state, latest_period, threshold).reset_index()
+    if len(thin):
+        with st.expander("Thin-market segments"):
+            thin["Segment"] = [segment_label(d, s) for d, s in zip(thin[DIMENSION], thin["Segment"])]
+            st.dataframe(thin[[DIMENSION, "Segment", CONCENTRATION, "Change (pp)", "Payments"]],
+                         hide_index=True, use_container_width=True)
+
+@st.fragment
+@trace.traced("section:providers")
+def providers_section():
     st.markdown("### 🏢 Providers")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Active AT Providers", format_number(active_providers))
-    col2.metric("Participants per Provider", format_number(ppp))
-    col3.metric("Top 5 Provider Share", "45% (simulated)")
+    col1.metric(category_label(category, "Active {} Providers"), format_number(active_providers),
+                format_delta(deltas, "active_providers"))
+    col2.metric("Participants per Provider", format_number(ppp), format_delta(deltas, "ppp"))
+    col3.metric("Top 10 Provider Share", format_percent(top10_share), format_delta(deltas, "market_concentration"))
 
     reach_data = pd.DataFrame({
         "Range": ["<10", "10-50", "51-100", "101-500", "500+"],
         "Providers": [400, 250, 150, 80, 20]
     })
-    reach_chart = alt.Chart(reach_data).mark_bar().encode(
-        x="Providers", y=alt.Y("Range", sort=["<10", "10-50", "51-100", "101-500", "500+"]),
-        color=alt.value("#9467bd"),
-        tooltip=["Range", "Providers"]
-    ).properties(title="Provider Reach Distribution", height=300)
-    st.altair_chart(reach_chart, use_container_width=True)
+    def reach_chart(data):
+        return alt.Chart(data).mark_bar().encode(
+            x="Providers", y=alt.Y("Range", sort=["<10", "10-50", "51-100", "101-500", "500+"]),
+            color=alt.value("#9467bd"),
+            tooltip=["Range", "Providers"]
+        ).properties(title="Provider Reach Distribution", height=300)
+    show_chart(reach_chart, reach_data)
 
     scope_data = pd.DataFrame({"Type": ["Multi-line Providers", "Niche Providers"], "Share": [40, 60]})
-    scope_chart = alt.Chart(scope_data).mark_arc(innerRadius=50).encode(
-        theta="Share",
-        color=alt.Color("Type", scale=alt.Scale(scheme="purples")),
-        tooltip=["Type", "Share"]
-    ).properties(title="Scope of Supply (simulated)")
-    st.altair_chart(scope_chart, use_container_width=True)
-
-    regional_data = pd.DataFrame({"Region": ["Metro", "Regional", "Remote"], "Providers": [70, 25, 5]})
-    reg_chart = alt.Chart(regional_data).mark_bar().encode(
-        x="Providers", y="Region", color=alt.value("#9467bd"), tooltip=["Region", "Providers"]
-    ).properties(title="Regional Coverage (simulated)", height=200)
-    st.altair_chart(reg_chart, use_container_width=True)
+    def scope_chart(data):
+        return alt.Chart(data).mark_arc(innerRadius=50).encode(
+            theta="Share",
+            color=alt.Color("Type", scale=alt.Scale(scheme="purples")),
+            tooltip=["Type", "Share"]
+        ).properties(title="Scope of Supply (simulated)")
+    show_chart(scope_chart, scope_data)
+
+    # From Provider by Remoteness Rating: MMM bands, or grouped into Metro / Regional / Remote
+    view = st.radio("Regional view", ["Metro / Regional / Remote", "MM bands"],
+                    horizontal=True, key="regional_view")
+    if view == "MM bands":
+        groups = {band: segment_label("Remoteness Rating", band) for band in REMOTENESS_GROUPS}
+    else:
+        groups = REMOTENESS_GROUPS
+    regional, order = regional_data(cube, category, state, latest_period, groups)
+    show_chart(regional_chart, regional, order=order)
+
 
-# -----------------------------
 # ROW 3: Key Statistics Snapshot
+@st.fragment
+@trace.traced("section:key_statistics")
+def key_statistics_section():
+    st.markdown("### 📊 Key Statistics Snapshot")
+    col1, col2, col3 = st.columns(3)
+    col1.metric(category_label(category, "Total {} Spend"), format_currency(payments), format_delta(deltas, "payments"))
+    col2.metric(category_label(category, "{} Participants"), format_number(active_participants),
+                format_delta(deltas, "active_participants"))
+    col3.metric("Active Providers", format_number(active_providers), format_delta(deltas, "active_providers"))
+    col1.metric("Utilisation", utilisation, format_delta(deltas, "utilisation"))
+    col2.metric("Avg Committed Support", format_currency(avg_committed), format_delta(deltas, "avg_committed"))
+    col3.metric("Innovation Uptake", "3.5% (simulated)")
+
+
 # -----------------------------
-st.markdown("### 📊 Key Statistics Snapshot")
-col1, col2, col3 = st.columns(3)
-col1.metric("Total AT Spend", format_currency(payments))
-col2.metric("Participants with AT", format_number(active_participants))
-col3.metric("Active Providers", format_number(active_providers))
-col1.metric("Utilisation", utilisation)
-col2.metric("Avg Committed Support", format_currency(avg_committed))
-col3.metric("Innovation Uptake", "3.5% (simulated)")
+# Layout
+# -----------------------------
+row1_col1, row1_col2 = st.columns(2)
+with row1_col1:
+    expenditure_section()
+with row1_col2:
+    participants_section()
+
+row2_col1, row2_col2 = st.columns(2)
+with row2_col1:
+    market_dynamics_section()
+with row2_col2:
+    providers_section()
+
+key_statistics_section()
+
+# -----------------------------
+# Ad-hoc SQL (needs the optional duckdb package)
+# -----------------------------
+if query_available():
+    with st.sidebar.expander("SQL query"):
+        with st.form("sql_query"):
+            sql = st.text_area(
+                "Single SELECT over the loaded sheets",
+                'SELECT "Period", payments, utilisation\nFROM kpis\n'
+                f"WHERE \"Support Category\" = '{AT_CATEGORY}'\nORDER BY \"Period\"",
+                height=150,
+            )
+            submitted = st.form_submit_button("Run")
+        st.caption("Tables: " + ", ".join(tables(DATA_DIR)))
+    if submitted:
+        with trace.span("sql") as span:
+            try:
+                result = query(sql, data_dir=DATA_DIR, limit=1000)
+                span["rows"] = len(result)
+                st.sidebar.dataframe(result, hide_index=True)
+            except QueryError as exc:
+                st.sidebar.error(str(exc))
+
+# -----------------------------
+# Data cache diagnostics
+# -----------------------------
+record_baseline()  # process RSS once a first full page run is done; later sessions add to it
+st.sidebar.caption(f"Rerun time (server): {(time.perf_counter() - rerun_started) * 1000:.0f} ms")
+
+with st.sidebar.expander("Data cache"):
+    stats = cache_stats()
+    st.write(f"Hits: {stats['hits']} | Misses: {stats['misses']} | Entries: {stats['entries']}")
+    if stats["last_changed"]:
+        st.write(f"Last reload changed: {', '.join(stats['last_changed'])}")
+    memory = session_memory(sheets)
+    sessions = memory["sessions"] if memory["sessions"] is not None else "n/a"
+    st.write(f"Shared dataset: {memory['shared_bytes'] / 2**20:.1f} MB | RSS: {memory['rss'] / 2**20:.0f} MB")
+    st.write(f"Sessions: {sessions} | Per session: {memory['per_session_bytes'] / 2**20:.2f} MB")
+    specs = spec_cache_stats()
+    st.write(f"Chart specs: {specs['hits']} hits | {specs['misses']} compiled | {specs['entries']} cached")
+
+# -----------------------------
+# Rerun trace
+# -----------------------------
+with st.sidebar.expander("Rerun trace"):
+    spans = pd.DataFrame(trace.current().records())
+    labels = spans["chart"].fillna(spans["span"]) if "chart" in spans else spans["span"]
+    spans["Stage"] = ["\u2003" * depth + label for depth, label in zip(spans["depth"], labels)]
+    spans = spans.reindex(columns=["Stage", "duration_ms", "rows", "cache_hits", "cache_misses", "bytes"])
+    st.dataframe(
+        spans.rename(columns={"duration_ms": "ms", "cache_hits": "hits", "cache_misses": "misses"}),
+        hide_index=True, use_container_width=True,
+        column_config={"ms": st.column_config.NumberColumn(format="%.1f")},
+    )
+    st.caption("Section reruns are traced separately. ATMARKET_TRACE=1 logs every trace as JSON lines on stdout.")
+trace.finish()
@@ -1,99 +1,66 @@
-# streamlit_app.py
+# streamlit_app_V1.py
 # AT Market Snapshot - Glossy Style (AT-only, All Australia data from ./data/Explore_Data_2025_09_18.xlsx)
 
 import streamlit as st
 import pandas as pd
 import altair as alt
 
-# -----------------------------
-# Load data
-# -----------------------------
-DATA_PATH = "data/Explore_Data_2025_09_18.xlsx"
-
-market_total = pd.read_excel(DATA_PATH, sheet_name="Market by Total")
-participants_total = pd.read_excel(DATA_PATH, sheet_name="ActPrtpnt by Total")
-providers_total = pd.read_excel(DATA_PATH, sheet_name="Provider by Total")
-
-# -----------------------------
-# Normalise column names
-# -----------------------------
-for df in [market_total, participants_total, providers_total]:
-    df.columns = df.columns.str.strip()
-    df["Support Category"] = df["Support Category"].astype(str).str.strip()
-    df["State/Territory"] = df["State/Territory"].astype(str).str.strip()
+from atmarket.charts import chart_spec, series_data
+from atmarket.formatting import format_currency, format_number, format_percent
+from atmarket.kpis import headline_kpis
+from atmarket.model import ALL_AUSTRALIA, AT_CATEGORY, select
+from atmarket.report import spend_data
+from atmarket.store import DATA_DIR, load_history
 
 # -----------------------------
-# Filter: AT only + All Australia
+# Helpers
 # -----------------------------
-market_at_all = market_total[
-    (market_total["Support Category"] == "Capital - Assistive Technology") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
+def show_chart(build, data, **params):
+    # Compiled spec shared with every page and session while data and definition are unchanged
+    st.vega_lite_chart(chart_spec(build, data, **params), use_container_width=True)
 
-participants_at_all = participants_total[
-    (participants_total["Support Category"] == "Capital - Assistive Technology") &
-    (participants_total["State/Territory"] == "All Australia")
-].copy()
-
-providers_at_all = providers_total[
-    (providers_total["Support Category"] == "Capital - Assistive Technology") &
-    (providers_total["State/Territory"] == "All Australia")
-].copy()
-
-# Also get ALL supports for comparison
-market_all_supports = market_total[
-    (market_total["Support Category"] == "All") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
+def trend_chart(data, field, title, fmt=None):
+    return alt.Chart(data).mark_line(point=True).encode(
+        x="Period",
+        y=alt.Y(field, title=title),
+        tooltip=["Period", alt.Tooltip(field, format=fmt) if fmt else field]
+    ).properties(height=200)
 
 # -----------------------------
-# Latest period
+# Load data
 # -----------------------------
-latest_period = market_at_all["Period"].unique().max()
+# Shared, process-wide dataset (atmarket.store): every page variant renders from the same
+# parsed frames, so adding a layout adds no load time or memory
+sheets = load_history(DATA_DIR)
 
-market_at = market_at_all[market_at_all["Period"] == latest_period]
-participants_at = participants_at_all[participants_at_all["Period"] == latest_period]
-providers_at = providers_at_all[providers_at_all["Period"] == latest_period]
-market_all_supports_latest = market_all_supports[market_all_supports["Period"] == latest_period]
+# AT only + All Australia: one slim (Period, metric) series per chart
+spend_series = spend_data(sheets, AT_CATEGORY, ALL_AUSTRALIA)
+participant_series = series_data(
+    select(sheets["ActPrtpnt by Total"], AT_CATEGORY, ALL_AUSTRALIA), "Period", "Active participants"
+)
+provider_series = series_data(select(sheets["Provider by Total"], AT_CATEGORY, ALL_AUSTRALIA), "Period", "Active provider")
 
 # -----------------------------
-# Extract latest values
+# Latest-period KPIs (atmarket.kpis)
 # -----------------------------
-payments = market_at["Payments"].iloc[0]
-committed = market_at["Committed supports"].iloc[0]
-utilisation = f"{market_at['Utilisation'].iloc[0]}%"
+kpis = headline_kpis(sheets, AT_CATEGORY, ALL_AUSTRALIA)
+latest_period = kpis["period"]
+payments = kpis["payments"]
+committed = kpis["committed"]
+utilisation = format_percent(kpis["utilisation"])
 
-active_participants = participants_at["Active participants"].iloc[0]
-avg_committed = participants_at["Average committed support"].iloc[0]
-avg_payments = participants_at["Average payments"].iloc[0]
+active_participants = kpis["active_participants"]
+avg_committed = kpis["avg_committed"]
+avg_payments = kpis["avg_payments"]
 
-active_providers = providers_at["Active provider"].iloc[0]
-
-# -----------------------------
-# Clean numeric fields for charts
-# -----------------------------
-def clean_currency(series):
-    return series.replace('[\$,]', '', regex=True).astype(float)
-
-market_at_all["Payments_num"] = clean_currency(market_at_all["Payments"])
-market_at_all["Committed_num"] = clean_currency(market_at_all["Committed supports"])
-market_all_supports["Payments_num"] = clean_currency(market_all_supports["Payments"])
-market_all_supports["Committed_num"] = clean_currency(market_all_supports["Committed supports"])
-participants_at_all["Active_num"] = participants_at_all["Active participants"].astype(float)
-providers_at_all["Providers_num"] = providers_at_all["Active provider"].astype(float)
+active_providers = kpis["active_providers"]
 
 # % share of total
-at_share_payments = (
-    clean_currency(market_at["Payments"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Payments"]).iloc[0] * 100
-)
-at_share_committed = (
-    clean_currency(market_at["Committed supports"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Committed supports"]).iloc[0] * 100
-)
+at_share_payments = kpis["share_payments"]
+at_share_committed = kpis["share_committed"]
 
 # Derived participants per provider
-ppp = round(active_participants / active_providers, 1) if active_providers > 0 else 0
+ppp = kpis["ppp"]
 
 # -----------------------------
 # HEADER
@@ -110,16 +77,11 @@ st.caption(f"{latest_period} | Source: NDIA internal data (Capital – Assistive
 with st.container():
     st.markdown("### 💰 Total Expenditure")
     col1, col2, col3 = st.columns(3)
-    col1.metric("AT Payments", payments, f"{at_share_payments:.1f}% of total")
-    col2.metric("AT Committed Supports", committed, f"{at_share_committed:.1f}% of total")
+    col1.metric("AT Payments", format_currency(payments), f"{at_share_payments:.1f}% of total")
+    col2.metric("AT Committed Supports", format_currency(committed), f"{at_share_committed:.1f}% of total")
     col3.metric("Utilisation", utilisation)
 
-    spend_chart = alt.Chart(market_at_all).mark_line(point=True).encode(
-        x="Period",
-        y=alt.Y("Payments_num", title="AT Payments ($)"),
-        tooltip=["Period", "Payments"]
-    ).properties(height=200)
-    st.altair_chart(spend_chart, use_container_width=True)
+    show_chart(trend_chart, spend_series, field="Payments", title="AT Payments ($)", fmt="$,.2f")
 
     # Simulated breakdown charts
     st.write("#### Where is AT spend happening?")
@@ -165,16 +127,11 @@ with st.container():
 with st.container():
     st.markdown("### 👥 Participants")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Active Participants", active_participants)
-    col2.metric("Avg Committed Support", avg_committed)
-    col3.metric("Avg Payments", avg_payments)
+    col1.metric("Active Participants", format_number(active_participants))
+    col2.metric("Avg Committed Support", format_currency(avg_committed))
+    col3.metric("Avg Payments", format_currency(avg_payments))
 
-    participant_chart = alt.Chart(participants_at_all).mark_line(point=True).encode(
-        x="Period",
-        y=alt.Y("Active_num", title="Active Participants"),
-        tooltip=["Period", "Active participants"]
-    ).properties(height=200)
-    st.altair_chart(participant_chart, use_container_width=True)
+    show_chart(trend_chart, participant_series, field="Active participants", title="Active Participants")
 
 # -----------------------------
 # PROVIDERS
@@ -182,15 +139,10 @@ with st.container():
 with st.container():
     st.markdown("### 🏢 Providers")
     col1, col2 = st.columns(2)
-    col1.metric("Active AT Providers", active_providers)
-    col2.metric("Participants per Provider", ppp)
+    col1.metric("Active AT Providers", format_number(active_providers))
+    col2.metric("Participants per Provider", format_number(ppp))
 
-    provider_chart = alt.Chart(providers_at_all).mark_line(point=True).encode(
-        x="Period",
-        y=alt.Y("Providers_num", title="Active Providers"),
-        tooltip=["Period", "Active provider"]
-    ).properties(height=200)
-    st.altair_chart(provider_chart, use_container_width=True)
+    show_chart(trend_chart, provider_series, field="Active provider", title="Active Providers")
 
 # -----------------------------
 # MARKET DYNAMICS (placeholder KPIs for now)
@@ -208,9 +160,9 @@ with st.container():
 with st.container():
     st.markdown("### 📊 Key Statistics Snapshot")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total AT Spend", payments)
-    col2.metric("Participants with AT", active_participants)
-    col3.metric("Active Providers", active_providers)
+    col1.metric("Total AT Spend", format_currency(payments))
+    col2.metric("Participants with AT", format_number(active_participants))
+    col3.metric("Active Providers", format_number(active_providers))
     col1.metric("Utilisation", utilisation)
-    col2.metric("Avg Committed Support", avg_committed)
+    col2.metric("Avg Committed Support", format_currency(avg_committed))
     col3.metric("Innovation Uptake", "3.5% (simulated)")
@@ -1,4 +1,4 @@
-# streamlit_app.py
+# streamlit_app_V3.py
 # Assistive Technology Market Snapshot - Wide Layout with Section Dividers
 
 import streamlit as st
@@ -10,117 +10,48 @@ import altair as alt
 # -----------------------------
 st.set_page_config(page_title="AT Market Snapshot", layout="wide")
 
-# -----------------------------
-# Helpers: Format numbers nicely
-# -----------------------------
-def format_currency(value):
-    try:
-        value = float(str(value).replace(",", "").replace("$", ""))
-    except:
-        return str(value)
-    if abs(value) >= 1_000_000_000:
-        return f"${value/1_000_000_000:.2f}B"
-    elif abs(value) >= 1_000_000:
-        return f"${value/1_000_000:.2f}M"
-    elif abs(value) >= 1_000:
-        return f"${value/1_000:.2f}K"
-    else:
-        return f"${value:.2f}"
-
-def format_number(value):
-    try:
-        value = int(value)
-        return f"{value:,}"
-    except:
-        return str(value)
-
-# -----------------------------
-# Load data
-# -----------------------------
-DATA_PATH = "data/Explore_Data_2025_09_18.xlsx"
-
-market_total = pd.read_excel(DATA_PATH, sheet_name="Market by Total")
-participants_total = pd.read_excel(DATA_PATH, sheet_name="ActPrtpnt by Total")
-providers_total = pd.read_excel(DATA_PATH, sheet_name="Provider by Total")
-
-# -----------------------------
-# Normalise column names
-# -----------------------------
-for df in [market_total, participants_total, providers_total]:
-    df.columns = df.columns.str.strip()
-    df["Support Category"] = df["Support Category"].astype(str).str.strip()
-    df["State/Territory"] = df["State/Territory"].astype(str).str.strip()
+from atmarket import report  # noqa: E402
+from atmarket.charts import chart_spec  # noqa: E402
+from atmarket.formatting import format_currency, format_number, format_percent  # noqa: E402
+from atmarket.kpis import headline_kpis  # noqa: E402
+from atmarket.model import ALL_AUSTRALIA, AT_CATEGORY  # noqa: E402
+from atmarket.store import DATA_DIR, load_history  # noqa: E402
 
 # -----------------------------
-# Filter: AT only + All Australia
+# Helpers
 # -----------------------------
-market_at_all = market_total[
-    (market_total["Support Category"] == "Capital - Assistive Technology") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
-
-participants_at_all = participants_total[
-    (participants_total["Support Category"] == "Capital - Assistive Technology") &
-    (participants_total["State/Territory"] == "All Australia")
-].copy()
-
-providers_at_all = providers_total[
-    (providers_total["Support Category"] == "Capital - Assistive Technology") &
-    (providers_total["State/Territory"] == "All Australia")
-].copy()
-
-# Also get ALL supports for comparison
-market_all_supports = market_total[
-    (market_total["Support Category"] == "All") &
-    (market_total["State/Territory"] == "All Australia")
-].copy()
+def show_chart(build, data, **params):
+    # Compiled spec shared with every page and session while data and definition are unchanged
+    st.vega_lite_chart(chart_spec(build, data, **params), use_container_width=True)
 
 # -----------------------------
-# Latest period
+# Load data
 # -----------------------------
-latest_period = market_at_all["Period"].unique().max()
-
-market_at = market_at_all[market_at_all["Period"] == latest_period]
-participants_at = participants_at_all[participants_at_all["Period"] == latest_period]
-providers_at = providers_at_all[providers_at_all["Period"] == latest_period]
-market_all_supports_latest = market_all_supports[market_all_supports["Period"] == latest_period]
+# Shared, process-wide dataset (atmarket.store): every page variant renders from the same
+# parsed frames, so adding a layout adds no load time or memory
+sheets = load_history(DATA_DIR)
 
 # -----------------------------
-# Extract latest values
+# Latest-period KPIs (atmarket.kpis)
 # -----------------------------
-payments = market_at["Payments"].iloc[0]
-committed = market_at["Committed supports"].iloc[0]
-utilisation = f"{market_at['Utilisation'].iloc[0]}%"
-
-active_participants = participants_at["Active participants"].iloc[0]
-avg_committed = participants_at["Average committed support"].iloc[0]
-avg_payments = participants_at["Average payments"].iloc[0]
+kpis = headline_kpis(sheets, AT_CATEGORY, ALL_AUSTRALIA)
+latest_period = kpis["period"]
+payments = kpis["payments"]
+committed = kpis["committed"]
+utilisation = format_percent(kpis["utilisation"])
 
-active_providers = providers_at["Active provider"].iloc[0]
+active_participants = kpis["active_participants"]
+avg_committed = kpis["avg_committed"]
+avg_payments = kpis["avg_payments"]
 
-# -----------------------------
-# Clean numeric fields for charts
-# -----------------------------
-def clean_currency(series):
-    return series.replace('[\$,]', '', regex=True).astype(float)
-
-market_at_all["Payments_num"] = clean_currency(market_at_all["Payments"])
-market_all_supports["Payments_num"] = clean_currency(market_all_supports["Payments"])
-participants_at_all["Active_num"] = participants_at_all["Active participants"].astype(float)
-providers_at_all["Providers_num"] = providers_at_all["Active provider"].astype(float)
+active_providers = kpis["active_providers"]
 
 # % share of total
-at_share_payments = (
-    clean_currency(market_at["Payments"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Payments"]).iloc[0] * 100
-)
-at_share_committed = (
-    clean_currency(market_at["Committed supports"]).iloc[0] /
-    clean_currency(market_all_supports_latest["Committed supports"]).iloc[0] * 100
-)
+at_share_payments = kpis["share_payments"]
+at_share_committed = kpis["share_committed"]
 
 # Derived participants per provider
-ppp = round(active_participants / active_providers, 1) if active_providers > 0 else 0
+ppp = kpis["ppp"]
 
 # -----------------------------
 # Section divider
@@ -151,12 +82,8 @@ with row1_col1:
     col2.metric("AT Committed Supports", format_currency(committed), f"{at_share_committed:.1f}% of total")
     col3.metric("Utilisation", utilisation)
 
-    spend_chart = alt.Chart(market_at_all).mark_area(opacity=0.6).encode(
-        x="Period",
-        y=alt.Y("Payments_num", title="AT Payments ($)"),
-        tooltip=["Period", "Payments"]
-    ).properties(height=200)
-    st.altair_chart(spend_chart, use_container_width=True)
+    # Same builder, slim data and cached spec as the main dashboard (atmarket.report)
+    show_chart(report.spend_chart, report.spend_data(sheets, AT_CATEGORY, ALL_AUSTRALIA))
 
     st.write("**Top 10 AT Support Items by Spend (simulated)**")
     item_data = pd.DataFrame({